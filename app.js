@@ -18,6 +18,7 @@ const state = {
   currentIndex: 0,
   answers: new Map(), // id -> {selected, correct}
   pendingSelections: new Map(), // id -> Set<optionIndex> (multi-correct questions)
+  fullSession: false, // a pakli az összes kérdésből indult (a később érkező darabok ide kerülnek)
 };
 
 function getTopicConfig() {
@@ -37,7 +38,18 @@ function getTopicConfig() {
       label: "Konkurens",
     },
   };
-  return map[topic] || map.szamelm;
+  const cfg = map[topic] || map.szamelm;
+  // ?quiz=<quiz_label> betölti csak az adott kvíz darabját (az extractor --shard kimenete).
+  const quiz = params.get("quiz");
+  if (quiz) {
+    return { ...cfg, file: cfg.file.replace(/\.json$/, `/${encodeURIComponent(quiz)}.json`) };
+  }
+  // Az extractor --deck kimenete (index + kvízenkénti darabok) csak kérésre (?chunks=1) vagy ha a
+  // témánál be van állítva (index: "<fájl>.index.json"); egyébként marad az egész fájl, felesleges kérés nélkül.
+  if (params.get("chunks") === "1" && !cfg.index) {
+    return { ...cfg, index: cfg.file.replace(/\.json$/, ".index.json") };
+  }
+  return cfg;
 }
 
 const escapeHtml = (text = "") =>
@@ -85,9 +97,21 @@ async function init() {
     const topicLabel = document.getElementById("topic-label");
     if (topicLabel) topicLabel.textContent = `Kvíz gyakorlás · ${cfg.label}`;
 
-    const res = await fetch(cfg.file);
-    if (!res.ok) throw new Error(`Nem sikerült betölteni a kérdéseket (${res.status})`);
-    state.allQuestions = await res.json();
+    const deckIndex = cfg.index ? await fetchDeckIndex(cfg.index) : null;
+    if (deckIndex) {
+      const base = cfg.index.slice(0, cfg.index.lastIndexOf("/") + 1);
+      const [first, ...rest] = deckIndex.chunks;
+      state.allQuestions = await fetchQuestions(base + first.file);
+      startSession(state.allQuestions);
+      rest.forEach((chunk) => {
+        fetchQuestions(base + chunk.file)
+          .then(appendQuestions)
+          .catch(() => {});
+      });
+      return;
+    }
+
+    state.allQuestions = await fetchQuestions(cfg.file);
     startSession(state.allQuestions);
   } catch (err) {
     els.questionTitle.textContent = "Hoppá, hiba történt";
@@ -98,7 +122,40 @@ async function init() {
   }
 }
 
+async function fetchQuestions(file) {
+  const res = await fetch(file);
+  if (!res.ok) throw new Error(`Nem sikerült betölteni a kérdéseket (${res.status})`);
+  return res.json();
+}
+
+async function fetchDeckIndex(file) {
+  try {
+    const res = await fetch(file);
+    if (!res.ok) return null;
+    const index = await res.json();
+    return index.chunks && index.chunks.length ? index : null;
+  } catch (err) {
+    return null;
+  }
+}
+
+function appendQuestions(list) {
+  state.allQuestions = state.allQuestions.concat(list);
+  if (state.fullSession) {
+    // Az új kérdések véletlen helyre kerülnek a még nem látott részbe, így a pakli egésze keverve marad.
+    const deck = [...state.deck];
+    list.forEach((q) => {
+      const start = Math.min(state.currentIndex + 1, deck.length);
+      const pos = start + Math.floor(Math.random() * (deck.length - start + 1));
+      deck.splice(pos, 0, q);
+    });
+    state.deck = deck;
+    updateStats();
+  }
+}
+
 function startSession(list) {
+  state.fullSession = list === state.allQuestions;
   state.deck = shuffle(list);
   state.currentIndex = 0;
   state.answers = new Map();
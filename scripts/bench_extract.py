@@ -0,0 +1,376 @@
+import argparse
+import json
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import extract_questions as eq
+
+
+WORDS = (
+    "adat csomag keret jel zaj csatorna kapcsoló hálózat protokoll antenna fogadó adó frekvencia "
+    "sávszélesség kódolás hiba moduláció réteg cím útvonal tábla port szegmens átvitel"
+).split()
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+LINE_HEIGHT = 14
+
+
+def _pdf_string(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: Path, pages: list[dict]) -> None:
+    """Minimális PDF írása: oldalanként tartalomfolyam (Helvetica szöveg, téglalapok) és opcionális kép."""
+    objects: list[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # page tree, filled in once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    kids: list[int] = []
+    for page in pages:
+        resources = "/Font << /F1 3 0 R >>"
+        ops = list(page.get("ops", []))
+        image = page.get("image")
+        if image is not None:
+            width, height, gray = image
+            data = zlib.compress(gray)
+            objects.append(
+                b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray "
+                b"/BitsPerComponent 8 /Filter /FlateDecode /Length %d >>\nstream\n" % (width, height, len(data))
+                + data
+                + b"\nendstream"
+            )
+            resources += f" /XObject << /Im1 {len(objects)} 0 R >>"
+            ops.append(f"q {PAGE_WIDTH} 0 0 {PAGE_HEIGHT} 0 0 cm /Im1 Do Q")
+
+        content = zlib.compress("\n".join(ops).encode("cp1252"))
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(content) + content + b"\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << {resources} >> /Contents {len(objects)} 0 R >>".encode()
+        )
+        kids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {len(kids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets: list[int] = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+
+
+class _PageWriter:
+    """Sorok egymás alá írása, új oldallal, ha elfogy a hely."""
+
+    def __init__(self) -> None:
+        self.pages: list[dict] = []
+        self.ops: list[str] = []
+        self.y = PAGE_HEIGHT - 40
+
+    def ensure(self, lines: int) -> None:
+        if self.y - lines * LINE_HEIGHT < 40:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.ops:
+            self.pages.append({"ops": self.ops})
+        self.ops = []
+        self.y = PAGE_HEIGHT - 40
+
+    def text(self, x: float, text: str, advance: bool = True) -> None:
+        self.ops.append(f"BT /F1 10 Tf {x} {self.y} Td ({_pdf_string(text)}) Tj ET")
+        if advance:
+            self.y -= LINE_HEIGHT
+
+    def highlight(self, x: float, width: float) -> None:
+        self.ops.append(f"0 1 0 rg {x} {self.y - 3} {width} {LINE_HEIGHT - 1} re f 0 0 0 rg")
+
+
+def _sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def telekom_pdf(path: Path, questions: int, options: int, highlight: float, rng: random.Random) -> None:
+    """Beugró/telekom formátum: számozott kérdések, • opciók, zöld kiemelés a helyes válaszon."""
+    w = _PageWriter()
+    for num in range(1, questions + 1):
+        w.ensure(options + 3)
+        kind = rng.random()
+        if kind < 0.15:
+            w.text(50, f"{num}. Igaz vagy hamis? {_sentence(rng, 6)}")
+            if rng.random() < 0.7:
+                w.text(50, f"{rng.choice(['Igaz', 'Hamis'])} {_sentence(rng, 3)}")
+        elif kind < 0.25:
+            w.text(50, f"{num}. Mi a {_sentence(rng, 4)}?")
+            w.text(50, _sentence(rng, 5))
+        else:
+            w.text(50, f"{num}. {_sentence(rng, 7)}, melyik igaz?")
+            correct = rng.randrange(options)
+            for idx in range(options):
+                opt = f"{_sentence(rng, 3)} {idx}"
+                if idx == correct and rng.random() < highlight:
+                    w.highlight(78, 220)
+                if rng.random() < 0.3:
+                    # Bullet stored as its own text object, like in the real answer-key PDFs.
+                    w.text(50, "•", advance=False)
+                    w.text(90, opt)
+                else:
+                    w.text(50, f"• {opt}")
+            if rng.random() < 0.2:
+                w.text(50, f"megoldás {correct}")
+    w.flush()
+    write_pdf(path, w.pages)
+
+
+def generic_pdf(path: Path, questions: int, options: int, rng: random.Random) -> None:
+    """Moodle-export formátum: "<pont> / <max> pont <k>. kérdés" fejlécek, Helyes válasz jelölés.
+
+    Az opciók két szóközzel behúzott sorok (néha a következő sorba törve), mint a valódi exportokban.
+    """
+    w = _PageWriter()
+    for num in range(1, questions + 1):
+        w.ensure(2 * options + 3)
+        w.text(50, f"{rng.choice((0, 1))} / 1 pont {num}. kérdés")
+        w.text(50, f"{_sentence(rng, 8)}?")
+        correct = rng.randrange(options)
+        for idx in range(options):
+            prefix = "Helyes válasz " if idx == correct else ""
+            # The extracted text keeps the two-space indent that starts an option in the real exports.
+            w.text(50, f"  {prefix}{_sentence(rng, 4)}")
+            if rng.random() < 0.2:
+                w.text(50, _sentence(rng, 3))  # wrapped continuation of the same option
+    w.flush()
+    write_pdf(path, w.pages)
+
+
+def check_generic_corpus(pdfs: list[Path], questions: int, options: int) -> None:
+    """A generált Moodle-exportoknak PDF-enként ``questions`` kérdést kell adniuk, ``options`` opcióval és
+    egy helyes válasszal; különben a mérés hibás kimenetet mérne."""
+    for pdf in pdfs:
+        parsed = eq.parse_generic_pdf(pdf)
+        counts = sorted({(len(q.options), sum(o.correct for o in q.options)) for q in parsed})
+        if len(parsed) != questions or counts != [(options, 1)]:
+            raise RuntimeError(
+                f"{pdf.name}: generated corpus does not round-trip ({len(parsed)} questions, "
+                f"(options, correct) {counts}; expected {questions} x ({options}, 1))"
+            )
+
+
+def scanned_pdf(path: Path, pages: int, questions_per_page: int, options: int, rng: random.Random) -> bool:
+    """Szkennelt (csak képet tartalmazó) oldalak az OCR-útvonalhoz; Pillow nélkül nem készül."""
+    try:
+        from PIL import Image, ImageDraw, ImageFont  # optional dependency (comes with pdfplumber)
+    except ImportError:
+        return False
+
+    try:
+        font = ImageFont.load_default(size=26)
+    except TypeError:
+        font = ImageFont.load_default()
+
+    out_pages: list[dict] = []
+    num = 0
+    for _ in range(pages):
+        img = Image.new("L", (PAGE_WIDTH * 2, PAGE_HEIGHT * 2), 255)
+        draw = ImageDraw.Draw(img)
+        y = 60
+        for _ in range(questions_per_page):
+            num += 1
+            lines = [f"{num}. kérdés", f"Melyik {_sentence(rng, 5)}?"]
+            correct = rng.randrange(options)
+            for idx in range(options):
+                lines.append(f"{_sentence(rng, 3)}." if idx != correct else f"Helyes válasz {_sentence(rng, 3)}.")
+            for line in lines:
+                draw.text((80, y), line, fill=0, font=font)
+                y += 36
+            y += 24
+        out_pages.append({"image": (img.width, img.height, img.tobytes())})
+    write_pdf(path, out_pages)
+    return True
+
+
+def generate_corpus(
+    out_dir: Path,
+    pdfs: int,
+    questions: int,
+    options: int,
+    highlight: float,
+    scanned_pages: int,
+    seed: int,
+) -> list[Path]:
+    """Szintetikus vizsga-PDF-ek: ``pdfs`` darab telekom és generikus fájl, plusz opcionális szkennelt PDF."""
+    rng = random.Random(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for idx in range(pdfs):
+        telekom_pdf(out_dir / f"beugro-synth-{idx:02d}.pdf", questions, options, highlight, rng)
+        generic_pdf(out_dir / f"vizsga-synth-{idx:02d}.pdf", questions, options, rng)
+    if scanned_pages:
+        scanned_pdf(out_dir / "kviz12-synth.pdf", scanned_pages, 3, options, rng)
+    check_generic_corpus([out_dir / f"vizsga-synth-{idx:02d}.pdf" for idx in range(pdfs)], questions, options)
+    return eq.collect_pdfs(out_dir)
+
+
+def _page_count(pdf: Path) -> int:
+    try:
+        from pypdf import PdfReader  # type: ignore
+    except Exception:
+        from PyPDF2 import PdfReader  # type: ignore
+
+    return len(PdfReader(str(pdf)).pages)
+
+
+def _generic_blocks(pdfs: list[Path]) -> list[str]:
+    try:
+        from pypdf import PdfReader  # type: ignore
+    except Exception:
+        from PyPDF2 import PdfReader  # type: ignore
+
+    blocks: list[str] = []
+    for pdf in pdfs:
+        text = "\n".join((page.extract_text() or "") for page in PdfReader(str(pdf)).pages)
+        blocks.extend(eq.RE_GENERIC_BLOCK_START.split(text)[1:])
+    return blocks
+
+
+def _run_case(name: str, pdfs: list[Path], jobs: int) -> dict:
+    """Egy mérés futtatása; külön folyamatban hívjuk, hogy a csúcs-RSS esetenként mérhető legyen."""
+    questions = 0
+    pages = sum(_page_count(pdf) for pdf in pdfs)
+    start = time.perf_counter()
+    if name == "parse_block":
+        blocks = _generic_blocks(pdfs)
+        pages = 0
+        start = time.perf_counter()
+        questions = len([eq.parse_block(b) for b in blocks])
+    elif name == "parse_beugro_telekom":
+        questions = sum(len(eq.parse_beugro_telekom(pdf)) for pdf in pdfs)
+    elif name == "parse_pdf":
+        questions = sum(len(eq.parse_pdf(pdf)) for pdf in pdfs)
+    elif name == "build_questions":
+        questions = sum(1 for _ in eq.build_questions(pdfs, jobs=jobs))
+    else:
+        raise ValueError(f"Unknown benchmark: {name}")
+    seconds = time.perf_counter() - start
+
+    return {
+        "seconds": round(seconds, 4),
+        "questions": questions,
+        "pages": pages,
+        "questions_per_sec": round(questions / seconds, 1) if seconds else None,
+        "pages_per_sec": round(pages / seconds, 1) if seconds and pages else None,
+        # ru_maxrss is reported in KiB on Linux.
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def run_benchmarks(pdfs: list[Path], jobs: int = 1) -> dict[str, dict]:
+    telekom = [p for p in pdfs if "beugro" in p.stem.lower()]
+    generic = [p for p in pdfs if p.stem.lower().startswith("vizsga")]
+    scanned = [p for p in pdfs if p.name.lower().startswith("kviz12")]
+    ocr_ready = bool(scanned) and shutil.which("tesseract") is not None
+    everything = telekom + generic + (scanned if ocr_ready else [])
+
+    cases = {
+        "parse_block": generic,
+        "parse_beugro_telekom": telekom,
+        "parse_pdf": everything,
+        "build_questions": sorted(everything),
+    }
+    results: dict[str, dict] = {}
+    for name, files in cases.items():
+        if not files:
+            continue
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            results[name] = pool.submit(_run_case, name, files, jobs).result()
+    if scanned and not ocr_ready:
+        print("Skipping the OCR path: tesseract is not installed.")
+    return results
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], tolerance: float) -> list[str]:
+    regressions: list[str] = []
+    for name, res in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if res["seconds"] > base["seconds"] * (1 + tolerance):
+            regressions.append(f"{name}: {base['seconds']:.3f}s -> {res['seconds']:.3f}s")
+        if res["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{name}: peak RSS {base['peak_rss_mb']} MB -> {res['peak_rss_mb']} MB")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the PDF extractor on a synthetic exam corpus.")
+    parser.add_argument("--pdfs", type=int, default=4, help="PDFs generated per format (default: 4).")
+    parser.add_argument("--questions", type=int, default=100, help="Questions per PDF (default: 100).")
+    parser.add_argument("--options", type=int, default=4, help="Options per question (default: 4).")
+    parser.add_argument(
+        "--highlight", type=float, default=0.8, help="Share of correct options highlighted in green (default: 0.8)."
+    )
+    parser.add_argument(
+        "--scanned-pages", type=int, default=0, help="Pages of the scanned PDF for the OCR path (default: 0)."
+    )
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the corpus (default: 1).")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="--jobs passed to build_questions (default: 1).")
+    parser.add_argument("--corpus-dir", help="Keep the generated PDFs in this directory instead of a temp dir.")
+    parser.add_argument("--output", "-o", help="Write the results as JSON to this path.")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against (results of an earlier run).")
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Write the results to --baseline instead of comparing."
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="Allowed slowdown before flagging a regression (default: 0.2)."
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_dir = Path(args.corpus_dir) if args.corpus_dir else Path(tmp)
+        pdfs = generate_corpus(
+            corpus_dir, args.pdfs, args.questions, args.options, args.highlight, args.scanned_pages, args.seed
+        )
+        results = run_benchmarks(pdfs, jobs=args.jobs)
+
+    for name, res in results.items():
+        rate = f"{res['questions_per_sec']} q/s" + (f", {res['pages_per_sec']} pages/s" if res["pages_per_sec"] else "")
+        print(f"{name:<22} {res['seconds']:>8.3f}s  {rate}  peak RSS {res['peak_rss_mb']} MB")
+
+    report = {
+        "params": {k: getattr(args, k) for k in ("pdfs", "questions", "options", "highlight", "scanned_pages", "seed", "jobs")},
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        baseline_path = Path(args.baseline)
+        if args.save_baseline:
+            baseline_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+            print(f"Saved baseline to {baseline_path}")
+            return
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        if baseline.get("params") != report["params"]:
+            print("Warning: baseline was recorded with different corpus parameters.")
+        regressions = compare(results, baseline.get("results", {}), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+import argparse
+import json
+import math
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import bench_extract as bench
+import extract_questions as eq
+
+
+GOLDEN_DIR = Path(__file__).resolve().parent / "golden"
+BUDGETS_FILE = "budgets.json"
+# Synthetic OCR output per scanned PDF ({file name: [page texts]}): the lines the generator draws for
+# kviz12-synth.pdf, written out with the artefacts Tesseract produces (headers, footers, misread
+# markers, wrapped options). Replayed through parse_kviz12_text so the OCR heuristics are checked
+# without Tesseract; --ocr runs the real OCR parser as well.
+OCR_PAGES_FILE = "ocr-pages-synthetic.json"
+OCR_TEXT_CASE = "kviz12-text"
+# Budgets written by --update are the measured values times this factor.
+BUDGET_HEADROOM = 3.0
+# Fixed parameters, so the synthetic PDFs (and therefore the golden output) are byte-for-byte reproducible.
+SYNTHETIC_CORPUS = {"pdfs": 2, "questions": 40, "options": 4, "highlight": 0.8, "scanned_pages": 2, "seed": 1234}
+
+
+def _run_parser(pdfs: list[Path]) -> dict:
+    """Egy parser összes PDF-jének feldolgozása; külön folyamatban fut, hogy a csúcs-RSS mérhető legyen."""
+    start = time.perf_counter()
+    entries = {str(pdf): eq.pdf_entries(pdf, eq.parse_pdf(pdf)) for pdf in pdfs}
+    return {
+        "entries": entries,
+        "seconds": round(time.perf_counter() - start, 4),
+        # ru_maxrss is reported in KiB on Linux.
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def _run_ocr_text(ocr_pages: dict[str, list[str]]) -> dict:
+    """A szintetikus OCR-oldalszövegek feldolgozása (mint a :func:`_run_parser`, Tesseract nélkül)."""
+    start = time.perf_counter()
+    entries = {
+        name: eq.pdf_entries(Path(name), eq.parse_kviz12_text("\n\n".join(pages))) for name, pages in ocr_pages.items()
+    }
+    return {
+        "entries": entries,
+        "seconds": round(time.perf_counter() - start, 4),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def extract_corpora(
+    corpora: dict[str, list[Path]], ocr_pages: dict[str, list[str]]
+) -> tuple[dict[str, list[dict]], dict[str, dict], list[str]]:
+    """Az összes korpusz kinyerése parserenként csoportosítva, plusz a szintetikus OCR-szövegek.
+
+    Visszaadja a korpuszonkénti bejegyzéseket (a szintetikus OCR-szövegeké ``ocr`` néven), a parserenkénti
+    idő- és memóriamérést, valamint a kihagyott (hiányzó backendű) parserek nevét.
+    """
+    by_parser: dict[str, list[Path]] = {}
+    for pdfs in corpora.values():
+        for pdf in pdfs:
+            by_parser.setdefault(eq.select_parser(pdf).name, []).append(pdf)
+
+    measured: dict[str, dict] = {}
+    entries_by_pdf: dict[str, list[dict]] = {}
+    skipped: list[str] = []
+    for spec in eq.PARSERS:
+        pdfs = by_parser.get(spec.name)
+        if not pdfs:
+            continue
+        if missing := eq.missing_backends(spec):
+            print(f"Skipping {spec.name} ({len(pdfs)} PDFs): missing {', '.join(missing)}")
+            skipped.append(spec.name)
+            continue
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            result = pool.submit(_run_parser, pdfs).result()
+        entries_by_pdf.update(result.pop("entries"))
+        measured[spec.name] = {**result, "pdfs": len(pdfs)}
+
+    outputs = {
+        name: [entry for pdf in pdfs for entry in entries_by_pdf.get(str(pdf), [])]
+        for name, pdfs in corpora.items()
+    }
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        result = pool.submit(_run_ocr_text, ocr_pages).result()
+    outputs["ocr"] = [entry for entries in result.pop("entries").values() for entry in entries]
+    measured[OCR_TEXT_CASE] = {**result, "pdfs": len(ocr_pages)}
+    return outputs, measured, skipped
+
+
+def diff_entries(golden: list[dict], actual: list[dict], ignore_quizzes: set[str]) -> list[str]:
+    """Olvasható eltéréslista azonosító szerint: hozzáadott, eltűnt és megváltozott bejegyzések mezőnként."""
+    old = {q["id"]: q for q in golden if eq.entry_quiz(q["id"]) not in ignore_quizzes}
+    new = {q["id"]: q for q in actual}
+    blocks: dict[str, list[str]] = {}
+    for qid in old.keys() - new.keys():
+        blocks[qid] = [f"  - {qid}: {old[qid]['question'][:80]!r}"]
+    for qid in new.keys() - old.keys():
+        blocks[qid] = [f"  + {qid}: {new[qid]['question'][:80]!r}"]
+    for qid in old.keys() & new.keys():
+        a, b = old[qid], new[qid]
+        if a == b:
+            continue
+        blocks[qid] = lines = [f"  ~ {qid}"]
+        for key in sorted((a.keys() | b.keys()) - {"options", "id"}):
+            if a.get(key) != b.get(key):
+                lines.append(f"      {key}: {a.get(key)!r}")
+                lines.append(f"      {' ' * len(key)}  -> {b.get(key)!r}")
+        a_opts, b_opts = a.get("options", []), b.get("options", [])
+        for idx in range(max(len(a_opts), len(b_opts))):
+            before = a_opts[idx] if idx < len(a_opts) else None
+            after = b_opts[idx] if idx < len(b_opts) else None
+            if before != after:
+                lines.append(f"      options[{idx}]: {before!r}")
+                lines.append(f"      {' ' * len(str(idx))}           -> {after!r}")
+    return [line for qid in sorted(blocks) for line in blocks[qid]]
+
+
+def check_budgets(measured: dict[str, dict], budgets: dict[str, dict], scale: float) -> list[str]:
+    problems = []
+    for name, result in measured.items():
+        budget = budgets.get(name)
+        if budget is None:
+            problems.append(f"{name}: no budget recorded (run with --update)")
+            continue
+        if result["seconds"] > budget["seconds"] * scale:
+            problems.append(f"{name}: {result['seconds']:.2f}s over the {budget['seconds'] * scale:.2f}s budget")
+        if result["peak_rss_mb"] > budget["peak_rss_mb"]:
+            problems.append(f"{name}: peak RSS {result['peak_rss_mb']} MB over the {budget['peak_rss_mb']} MB budget")
+    return problems
+
+
+def _write_json(path: Path, data) -> None:
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Re-extract a deterministic synthetic corpus and replay the synthetic OCR page texts, compare the "
+            "entries with the golden JSON in scripts/golden/ by id, and check per-parser time and memory budgets."
+        )
+    )
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="Rewrite the golden files and budgets of the cases run (use with --ocr to include real OCR).",
+    )
+    parser.add_argument(
+        "--ocr",
+        action="store_true",
+        help=(
+            "Also run the Tesseract OCR parser on the scanned synthetic PDF (golden scanned.json). Off by default: "
+            "its output depends on the installed Tesseract version."
+        ),
+    )
+    parser.add_argument("--no-budgets", action="store_true", help="Only compare the output, skip time/memory budgets.")
+    parser.add_argument(
+        "--budget-scale",
+        type=float,
+        default=1.0,
+        help="Multiply the time budgets (e.g. 2 on a slower machine; default: 1).",
+    )
+    args = parser.parse_args()
+
+    ocr_pages_path = GOLDEN_DIR / OCR_PAGES_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        # The PDFs checked into the repository are free-response written exams that no parser yields entries
+        # for, so the harness runs on generated PDFs that exercise every parser.
+        pdfs = bench.generate_corpus(Path(tmp), **SYNTHETIC_CORPUS)
+        scanned = [pdf for pdf in pdfs if eq.select_parser(pdf).name == "kviz12-ocr"]
+        corpora = {"synthetic": [pdf for pdf in pdfs if pdf not in scanned]}
+        if args.ocr:
+            if not scanned:
+                parser.error("--ocr needs Pillow to generate the scanned PDF")
+            if missing := eq.missing_backends(eq.select_parser(scanned[0])):
+                parser.error(f"--ocr needs {', '.join(missing)}")
+            corpora["scanned"] = scanned
+        ocr_pages = json.loads(ocr_pages_path.read_text(encoding="utf-8")) if ocr_pages_path.exists() else {}
+        outputs, measured, skipped = extract_corpora(corpora, ocr_pages)
+        # Quiz labels per corpus whose parser could not run here (the synthetic OCR text always runs).
+        skipped_quizzes = {
+            name: {eq.quiz_label(pdf) for pdf in pdfs if eq.select_parser(pdf).name in skipped}
+            for name, pdfs in corpora.items()
+        }
+
+    for name, result in measured.items():
+        print(f"{name:<12} {result['pdfs']:>3} PDFs  {result['seconds']:8.2f}s  peak RSS {result['peak_rss_mb']} MB")
+
+    if args.update:
+        GOLDEN_DIR.mkdir(parents=True, exist_ok=True)
+        for name, entries in outputs.items():
+            path = GOLDEN_DIR / f"{name}.json"
+            if skipped_quizzes.get(name) and path.exists():
+                # Keep the golden entries of parsers that could not run here.
+                kept = [q for q in eq.load_questions(path) if eq.entry_quiz(q["id"]) in skipped_quizzes[name]]
+                entries = kept + entries
+            _write_json(path, entries)
+            print(f"Wrote {len(entries)} golden entries to {path}")
+        budgets_path = GOLDEN_DIR / BUDGETS_FILE
+        budgets = json.loads(budgets_path.read_text(encoding="utf-8")) if budgets_path.exists() else {}
+        for name, result in measured.items():
+            budgets[name] = {
+                "seconds": round(max(result["seconds"] * BUDGET_HEADROOM, 0.5), 2),
+                "peak_rss_mb": math.ceil(result["peak_rss_mb"] * BUDGET_HEADROOM / 10) * 10,
+            }
+        _write_json(budgets_path, dict(sorted(budgets.items())))
+        print(f"Wrote budgets to {budgets_path}")
+        return
+
+    failures = 0
+    for name, entries in outputs.items():
+        path = GOLDEN_DIR / f"{name}.json"
+        golden = eq.load_questions(path) if path.exists() else []
+        if not golden or not entries:
+            # An empty side compares nothing, so it cannot count as a pass.
+            print(f"{name}: {len(golden)} golden entries, {len(entries)} extracted; nothing to compare")
+            failures += 1
+            continue
+        lines = diff_entries(golden, entries, skipped_quizzes.get(name, set()))
+        if lines:
+            failures += 1
+            differing = sum(1 for line in lines if not line.startswith("      "))
+            print(f"{name}: {differing} entries differ from {path}")
+            print("\n".join(lines))
+        else:
+            print(f"{name}: {len(entries)} entries match")
+
+    if not args.no_budgets:
+        budgets_path = GOLDEN_DIR / BUDGETS_FILE
+        budgets = json.loads(budgets_path.read_text(encoding="utf-8")) if budgets_path.exists() else {}
+        for problem in check_budgets(measured, budgets, args.budget_scale):
+            print(f"Budget: {problem}")
+            failures += 1
+
+    if failures:
+        sys.exit(1)
+    print("Golden output and budgets OK")
+
+
+if __name__ == "__main__":
+    main()
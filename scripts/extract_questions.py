@@ -1,21 +1,233 @@
 import argparse
+import gzip
+import hashlib
+import importlib.util
+import io
 import json
+import os
+import queue
 import re
+import shutil
+import sqlite3
+import struct
+import time
+import unicodedata
+import zlib
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, replace
+from functools import cache, cached_property, lru_cache, partial
+from itertools import repeat
 from pathlib import Path
 
 
 PLACEHOLDER_EXPLANATION = "Magyarázat hamarosan."
+# Stand-in options/explanations the parsers use when the PDF has no recoverable answer.
+PLACEHOLDER_NO_SOLUTION = "A PDF nem tartalmazza a megoldást."
+PLACEHOLDER_FREE_TEXT = "Szabad szöveges válasz"
+PLACEHOLDER_REFLECTION = "Szabad szöveges válasz (reflexiós kérdés)"
+PLACEHOLDER_OPTIONS = frozenset({PLACEHOLDER_NO_SOLUTION, PLACEHOLDER_FREE_TEXT, PLACEHOLDER_REFLECTION})
+EXPLANATION_NO_MARKED_SOLUTION = "A PDF-ben ehhez a kérdéshez nem szerepel jelölt megoldás."
+EXPLANATION_NO_SOLUTION = "A PDF-ben ehhez a kérdéshez nem szerepel megoldás."
+OCR_RESOLUTION = 250
+OCR_LANG = "eng+hun"
+
+# Bump when a parser change should invalidate cached results even if this file's bytes stay the same.
+PARSER_VERSION = 1
+DEFAULT_CACHE_DIR = ".extract-cache"
+DEFAULT_CACHE_MAX_MB = 256
+OCR_CACHE_FILENAME = "ocr-pages.sqlite"
+
+# Precompiled patterns for the per-line loops of the parsers.
+RE_WHITESPACE = re.compile(r"\s+")
+RE_OPT_MARKERS = re.compile(r"Helyes!?Helyes!?|Helyes válasz|Megadott válasz", re.IGNORECASE)
+RE_GENERIC_BLOCK_START = re.compile(r"(?=\d+ / \d+ pont \d+\. kérdés)")
+RE_OCR_BLOCK_START = re.compile(r"\n(?=\d+\. k)")
+RE_OCR_HELYES = re.compile(r"helyes", re.IGNORECASE)
+RE_OCR_ANY_MARKER = re.compile(r"[hd]elyes", re.IGNORECASE)
+RE_OCR_MARKER_TEXT = re.compile(r"(?i)helyes!?|helyes valasz|delyes valasz")
+RE_NUMBERED_HEADER = re.compile(r"^(\d+)\.\s*(.*)$")
+RE_TF_IGAZ = re.compile(r"^igaz\b", re.IGNORECASE)
+RE_TF_HAMIS = re.compile(r"^hamis\b", re.IGNORECASE)
+RE_TF_QUESTION = re.compile(r"^igaz vagy hamis\?", re.IGNORECASE)
+RE_QUIZ_NUMBER = re.compile(r"Kvíz[- ]?(\d+)")
+RE_WORD = re.compile(r"\w+")
+
+LINE_HEADER = "header"
+LINE_BULLET = "bullet"
+LINE_MARKER = "marker"
+LINE_NOISE = "noise"
+LINE_TEXT = "text"
+
+# No line can match more than one alternative, so their order does not matter and one match gives
+# the same answer as testing each pattern separately. bullet and marker start with "•" and "h"/"d";
+# header and noise both start with digits, but the character after the digit run differs ("." vs
+# " of" / "/"). Keep that property when adding a kind.
+_LINE_KINDS = re.compile(
+    r"(?P<bullet>•)"
+    r"|(?P<header>\d+\.)"
+    r"|(?P<marker>(?i:helyes!?|helyes valasz|delyes valasz)$)"
+    r"|(?P<noise>\d+ of \d+|\d{1,2}/\d{1,2}/\d{2})"
+)
+
+
+# Stage records collected while --profile is on; None keeps the instrumentation to a single check.
+# Page indexes in the records are 0-based for every stage.
+_PROFILE: list[dict] | None = None
+# Parser-side facts about entries that the output schema does not carry (for --validate): id -> notes.
+_ENTRY_NOTES: dict[str, list[str]] | None = None
+
+
+def enable_profiling() -> list[dict]:
+    global _PROFILE
+    _PROFILE = []
+    return _PROFILE
+
+
+def enable_entry_notes() -> dict[str, list[str]]:
+    global _ENTRY_NOTES
+    _ENTRY_NOTES = {}
+    return _ENTRY_NOTES
+
+
+def _stage_start() -> tuple[float, float] | None:
+    if _PROFILE is None:
+        return None
+    return time.perf_counter(), time.process_time()
+
+
+def _stage_record(
+    stage: str,
+    wall_s: float,
+    cpu_s: float | None = None,
+    pdf: str | None = None,
+    page: int | None = None,
+    count: int = 0,
+) -> None:
+    if _PROFILE is not None:
+        _PROFILE.append(
+            {"stage": stage, "pdf": pdf, "page": page, "wall_s": wall_s, "cpu_s": cpu_s, "count": count}
+        )
+
+
+def _stage_end(
+    started: tuple[float, float] | None,
+    stage: str,
+    pdf: str | None = None,
+    page: int | None = None,
+    count: int = 0,
+) -> None:
+    if started is None:
+        return
+    wall0, cpu0 = started
+    _stage_record(stage, time.perf_counter() - wall0, time.process_time() - cpu0, pdf, page, count)
+
+
+def profile_report(records: list[dict]) -> dict:
+    """A szakaszrekordok összesítése szakaszonként és PDF-enként (a nyers rekordok is benne maradnak)."""
+
+    def add(table: dict, rec: dict) -> None:
+        agg = table.setdefault(rec["stage"], {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "count": 0})
+        agg["calls"] += 1
+        agg["wall_s"] += rec["wall_s"]
+        agg["cpu_s"] += rec["cpu_s"] or 0.0
+        agg["count"] += rec["count"]
+
+    stages: dict[str, dict] = {}
+    per_pdf: dict[str, dict] = {}
+    for rec in records:
+        add(stages, rec)
+        if rec["pdf"] is not None:
+            add(per_pdf.setdefault(rec["pdf"], {}), rec)
+    return {"stages": stages, "per_pdf": per_pdf, "records": records}
+
+
+def print_profile_table(report: dict, top: int = 15) -> None:
+    # Stages nest (parse_pdf contains the per-page stages), so the rows are not additive.
+    rows = sorted(
+        ((pdf, stage, agg) for pdf, table in report["per_pdf"].items() for stage, agg in table.items()),
+        key=lambda row: row[2]["wall_s"],
+        reverse=True,
+    )
+    print(f"{'pdf':<32} {'stage':<20} {'calls':>6} {'wall s':>9} {'cpu s':>9} {'count':>8}")
+    for pdf, stage, agg in rows[:top]:
+        print(
+            f"{pdf[:32]:<32} {stage:<20} {agg['calls']:>6} {agg['wall_s']:>9.3f} {agg['cpu_s']:>9.3f} {agg['count']:>8}"
+        )
+    print("Totals by stage:")
+    for stage, agg in sorted(report["stages"].items(), key=lambda kv: kv[1]["wall_s"], reverse=True):
+        print(f"  {stage:<20} {agg['calls']:>6} {agg['wall_s']:>9.3f}s wall {agg['cpu_s']:>9.3f}s cpu")
+
+
+def classify_line(line: str) -> str:
+    """Sor besorolása egyetlen illesztéssel: kérdésfejléc, felsorolásjel, helyes-jelölő, oldalzaj vagy szöveg."""
+    match = _LINE_KINDS.match(line)
+    return match.lastgroup if match else LINE_TEXT
+
+
+@dataclass(slots=True)
+class Line:
+    """Egy szövegsor a PDF-oldalon: hely, kiemelés és a :func:`classify_line` szerinti fajta."""
+
+    page: int
+    text: str
+    bbox: tuple[float, float, float, float]
+    highlight: bool = False
+    kind: str = LINE_TEXT
+
+
+@dataclass(slots=True)
+class Option:
+    text: str
+    correct: bool = False
+
+
+@dataclass(slots=True)
+class Question:
+    """Egy feldolgozott kérdés a parserek kimenetén (a kimeneti bejegyzést :func:`question_entry` adja)."""
+
+    question: str
+    options: list[Option]
+    header: str = ""
+    explanation: str = PLACEHOLDER_EXPLANATION
+
+    def to_dict(self) -> dict:
+        return {
+            "header": self.header,
+            "question": self.question,
+            "options": [{"text": o.text, "correct": o.correct} for o in self.options],
+            "explanation": self.explanation,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Question":
+        return cls(
+            question=data["question"],
+            options=[Option(o["text"], o["correct"]) for o in data["options"]],
+            header=data.get("header", ""),
+            explanation=data.get("explanation", PLACEHOLDER_EXPLANATION),
+        )
+
+
+def question_entry(qid: str, q: Question) -> dict:
+    """A kimeneti JSON-séma egy bejegyzése (``id``, ``question``, ``options``, ``explanation``)."""
+    return {
+        "id": qid,
+        "question": q.question,
+        "options": [{"text": o.text, "correct": o.correct} for o in q.options],
+        "explanation": PLACEHOLDER_EXPLANATION,
+    }
 
 
 def clean_opt_text(text: str) -> str:
-    text = re.sub(r"Helyes!?Helyes!?|Helyes válasz|Megadott válasz", "", text, flags=re.IGNORECASE)
+    text = RE_OPT_MARKERS.sub("", text)
     text = text.replace("Helyes válaszok", "")
     text = text.replace("okok", "")
-    text = re.sub(r"\s+", " ", text)
+    text = RE_WHITESPACE.sub(" ", text)
     return text.strip(" .")
 
 
-def parse_block(block: str) -> dict:
+def parse_block(block: str) -> Question:
     lines = block.strip().split("\n")
     header = lines[0]
     body_lines = lines[1:]
@@ -105,309 +317,719 @@ def parse_block(block: str) -> dict:
         else:
             merged[clean] = merged[clean] or corr
 
-    cleaned_opts = [{"text": t, "correct": merged[t]} for t in order]
-    return {"header": header, "question": qtext, "options": cleaned_opts}
+    return Question(qtext, [Option(t, merged[t]) for t in order], header)
+
 
+def _limit_ocr_threads() -> None:
+    # Tesseract spawns its own OpenMP threads; with one page per process that only oversubscribes the CPU.
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
 
-def parse_kviz12_ocr(pdf_path: Path) -> list[dict]:
-    """OCR-alapú feldolgozás a kviz12.pdf-hez."""
 
-    import pdfplumber  # optional dependency (only for OCR mode)
+@cache
+def _tesseract_version() -> str:
     import pytesseract  # optional dependency (only for OCR mode)
 
-    def ocr_text() -> str:
-        texts: list[str] = []
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                img = page.to_image(resolution=250).original  # PIL Image
-                text = pytesseract.image_to_string(img, lang="eng+hun")
-                texts.append(text)
-        return "\n\n".join(texts)
-
-    def parse_blocks(text: str) -> list[dict]:
-        parts = re.split(r"\n(?=\d+\. k)", text)
-        questions = []
-        for part in parts[1:]:
-            lines = [l.strip() for l in part.split("\n") if l.strip()]
-            lines = [
-                l
-                for l in lines
-                if "Kviz-12" not in l
-                and "module" not in l
-                and not re.match(r"\d+ of \d+", l)
-                and not re.match(r"\d{1,2}/\d{1,2}/\d{2}", l)
-            ]
-            if not lines:
+    return str(pytesseract.get_tesseract_version())
+
+
+# Page dictionary entries that decide what the rendered page looks like (inherited ones are already merged in).
+_OCR_PAGE_KEYS = ("MediaBox", "CropBox", "Rotate", "Contents", "Resources")
+
+
+def _hash_pdf_object(h, obj, seen: set[int]) -> None:
+    from pdfminer.pdftypes import PDFObjRef, PDFStream  # optional dependency (comes with pdfplumber)
+
+    if isinstance(obj, PDFObjRef):
+        h.update(b"R%d" % obj.objid)
+        if obj.objid in seen:  # shared (or cyclic) objects are hashed once
+            return
+        seen.add(obj.objid)
+        obj = obj.resolve()
+    if isinstance(obj, PDFStream):
+        _hash_pdf_object(h, obj.attrs, seen)
+        h.update(b"stream%d|" % len(obj.get_data()))
+        h.update(obj.get_data())
+    elif isinstance(obj, dict):
+        h.update(b"<<")
+        for name in sorted(obj, key=str):
+            h.update(f"/{name}=".encode())
+            _hash_pdf_object(h, obj[name], seen)
+        h.update(b">>")
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[")
+        for item in obj:
+            _hash_pdf_object(h, item, seen)
+        h.update(b"]")
+    else:
+        h.update(repr(obj).encode() + b"|")
+
+
+def _ocr_cache_key(doc: "PdfDocument", page_index: int, resolution: int) -> str:
+    # The page's content streams and resources (images, fonts) identify what would be rendered, so a
+    # cache hit needs no rasterization; settings that change the OCR text go in too.
+    h = hashlib.sha256()
+    h.update(f"dpi={resolution}|lang={OCR_LANG}|tesseract={_tesseract_version()}\n".encode())
+    attrs = doc.page(page_index).page_obj.attrs
+    seen: set[int] = set()
+    for name in _OCR_PAGE_KEYS:
+        h.update(f"/{name}=".encode())
+        _hash_pdf_object(h, attrs.get(name), seen)
+    return h.hexdigest()
+
+
+def _ocr_cache_connect(cache_path: Path) -> sqlite3.Connection:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(cache_path, timeout=60)
+    # WAL lets the OCR worker processes read while another one writes.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS ocr_pages (key TEXT PRIMARY KEY, text BLOB NOT NULL)")
+    return conn
+
+
+@lru_cache(maxsize=None)
+def _ocr_cache_connection(cache_path: Path, pid: int) -> sqlite3.Connection:
+    # One connection per process and cache file; the pid keeps forked workers off the parent's connection.
+    return _ocr_cache_connect(cache_path)
+
+
+def _ocr_page(
+    source: "PdfDocument | Path", page_index: int, resolution: int, cache_path: Path | None = None
+) -> tuple[str, float, float, bool]:
+    """Egy oldal raszterizálása és OCR-je.
+
+    A szöveg mellett a két lépés idejét is visszaadja, és azt, hogy az eredmény az oldalszintű
+    OCR-gyorsítótárból jött-e (ilyenkor sem a raszterizálás, sem a Tesseract nem fut). Munkafolyamatban
+    (``source`` elérési út) a folyamat egyszer nyitja meg a PDF-et az összes neki jutó oldalhoz.
+    """
+    import pytesseract  # optional dependency (only for OCR mode)
+
+    doc = source if isinstance(source, PdfDocument) else _worker_document(Path(source))
+    key = None
+    if cache_path is not None:
+        start = time.perf_counter()
+        key = _ocr_cache_key(doc, page_index, resolution)
+        row = (
+            _ocr_cache_connection(cache_path, os.getpid())
+            .execute("SELECT text FROM ocr_pages WHERE key = ?", (key,))
+            .fetchone()
+        )
+        if row is not None:
+            doc.release_page(page_index)
+            return zlib.decompress(row[0]).decode("utf-8"), 0.0, time.perf_counter() - start, True
+
+    start = time.perf_counter()
+    img = doc.image(page_index, resolution)
+    doc.release_page(page_index)  # the raster is all we need from this page
+    rasterized = time.perf_counter()
+
+    text = pytesseract.image_to_string(img, lang=OCR_LANG)
+    ocr_s = time.perf_counter() - rasterized
+    if key is not None:
+        with _ocr_cache_connection(cache_path, os.getpid()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ocr_pages (key, text) VALUES (?, ?)",
+                (key, zlib.compress(text.encode("utf-8"))),
+            )
+    return text, rasterized - start, ocr_s, False
+
+
+def _ocr_parse_blocks(text: str) -> list[Question]:
+    parts = RE_OCR_BLOCK_START.split(text)
+    questions = []
+    for part in parts[1:]:
+        lines: list[str] = []
+        kinds: list[str] = []
+        for l in part.split("\n"):
+            l = l.strip()
+            if not l or "Kviz-12" in l or "module" in l:
                 continue
-            header = lines[0]
-            rest = lines[1:]
-            if not rest:
+            kind = classify_line(l)
+            if kind == LINE_NOISE:
                 continue
+            lines.append(l)
+            kinds.append(kind)
+        if not lines:
+            continue
+        header = lines[0]
+        rest = lines[1:]
+        rest_kinds = kinds[1:]
+        if not rest:
+            continue
 
-            idx_marker = next((i for i, l in enumerate(rest) if re.search(r"helyes", l, re.I)), len(rest))
-            q_end = -1
-            for i in range(min(idx_marker, len(rest))):
-                if (
-                    "?" in rest[i]
-                    or "kód" in rest[i].lower()
-                    or "kell" in rest[i].lower()
-                    or "mit " in rest[i].lower()
-                    or "melyik" in rest[i].lower()
-                ):
-                    q_end = i
-            if q_end == -1:
-                q_end = 0
-
-            question_lines = rest[: q_end + 1]
-            option_lines = rest[q_end + 1 :]
-
-            options = []
-            buf = ""
-            buf_corr = False
-            next_corr = False
-            for line in option_lines:
-                if re.fullmatch(r"(?i)helyes!?|helyes valasz|delyes valasz", line):
-                    next_corr = True
-                    continue
+        has_helyes = [bool(RE_OCR_HELYES.search(l)) for l in rest]
+        idx_marker = next((i for i, h in enumerate(has_helyes) if h), len(rest))
+        q_end = -1
+        for i in range(min(idx_marker, len(rest))):
+            if (
+                "?" in rest[i]
+                or "kód" in rest[i].lower()
+                or "kell" in rest[i].lower()
+                or "mit " in rest[i].lower()
+                or "melyik" in rest[i].lower()
+            ):
+                q_end = i
+        if q_end == -1:
+            q_end = 0
+
+        question_lines = rest[: q_end + 1]
+        option_lines = rest[q_end + 1 :]
+
+        options = []
+        buf = ""
+        buf_corr = False
+        next_corr = False
+        for line, kind, helyes in zip(option_lines, rest_kinds[q_end + 1 :], has_helyes[q_end + 1 :]):
+            if kind == LINE_MARKER:
+                next_corr = True
+                continue
 
-                if re.search(r"helyes", line, re.I):
-                    clean_line = re.sub(r"(?i)helyes!?|helyes valasz|delyes valasz", "", line).strip(" .|")
-                    if clean_line:
-                        if buf:
-                            options.append({"text": buf.strip(), "correct": buf_corr})
-                        options.append({"text": clean_line, "correct": True})
-                        buf, buf_corr, next_corr = "", False, False
+            if helyes:
+                clean_line = RE_OCR_MARKER_TEXT.sub("", line).strip(" .|")
+                if clean_line:
+                    if buf:
+                        options.append(Option(buf.strip(), buf_corr))
+                    options.append(Option(clean_line, True))
+                    buf, buf_corr, next_corr = "", False, False
+                continue
+
+            if buf:
+                if (not buf.endswith((".", "?", "!"))) or line[:1].islower():
+                    buf += " " + line
                     continue
+                else:
+                    options.append(Option(buf.strip(), buf_corr))
+                    buf = ""
 
-                if buf:
-                    if (not buf.endswith((".", "?", "!"))) or line[:1].islower():
-                        buf += " " + line
-                        continue
-                    else:
-                        options.append({"text": buf.strip(), "correct": buf_corr})
-                        buf = ""
+            buf = line
+            buf_corr = next_corr
+            next_corr = False
 
-                buf = line
-                buf_corr = next_corr
-                next_corr = False
+        if buf:
+            options.append(Option(buf.strip(), buf_corr))
 
-            if buf:
-                options.append({"text": buf.strip(), "correct": buf_corr})
-
-            questions.append(
-                {
-                    "header": header,
-                    "question": "\n".join(question_lines).strip(),
-                    "options": options,
-                }
+        questions.append(Question("\n".join(question_lines).strip(), options, header))
+    return questions
+
+
+def _ocr_fixups(qs: list[Question]) -> list[Question]:
+    fixed = []
+    for q in qs:
+        # általános javítás: ha csak False van, adjuk hozzá a True opciót
+        if len(q.options) == 1 and q.options[0].text.lower() in ("false", "hamis"):
+            q.options.append(Option("True", False))
+
+        for opt in q.options:
+            if RE_OCR_ANY_MARKER.search(opt.text):
+                opt.text = RE_OCR_MARKER_TEXT.sub("", opt.text).strip(" .|")
+                opt.correct = True
+
+        # 16. kérdés speciális: iloc[1] -> második sor értékei
+        if q.header.startswith("16. kérdés"):
+            q.question = "Mit ad vissza az alábbi kód?\ndf = pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]})\nprint(df.iloc[1])"
+            q.options = [
+                Option("A második oszlop értékeit.", False),
+                Option("A sorindexet.", False),
+                Option("A második sor értékeit.", True),
+                Option("Hibát ad, mert hibás a szintaxis.", False),
+            ]
+
+        fixed.append(q)
+    return fixed
+
+
+def parse_kviz12_text(text: str) -> list[Question]:
+    """A kviz12 OCR-szövegének (oldalak ``\n\n``-nel összefűzve) feldolgozása Tesseract nélkül."""
+    return _ocr_fixups(_ocr_parse_blocks(text))
+
+
+def parse_kviz12_ocr(
+    source: "PdfDocument | Path",
+    resolution: int = OCR_RESOLUTION,
+    workers: int = 1,
+    report_timing: bool = False,
+    cache_path: Path | None = None,
+) -> list[Question]:
+    """OCR-alapú feldolgozás a kviz12.pdf-hez.
+
+    Az oldalak raszterizálása és OCR-je ``workers`` > 1 esetén párhuzamos folyamatokban fut,
+    a szövegek oldalsorrendben érkeznek vissza. ``cache_path`` megadásakor az oldalak OCR-szövege
+    egy SQLite-gyorsítótárba kerül, így a parse_kviz12_text heurisztikáinak módosítása után nem
+    kell újra OCR-ezni.
+    """
+
+    doc = as_document(source)
+    pdf_path = doc.path
+
+    def ocr_pages() -> Iterator[str]:
+        page_count = len(doc.plumber.pages)  # rasterizing needs pdfplumber anyway; skip the pypdf view
+
+        if workers <= 1 or page_count <= 1:
+            results: Iterator[tuple[str, float, float, bool]] = map(
+                _ocr_page, repeat(doc), range(page_count), repeat(resolution), repeat(cache_path)
             )
-        return questions
-
-    def fixups(qs: list[dict]) -> list[dict]:
-        fixed = []
-        for q in qs:
-            # általános javítás: ha csak False van, adjuk hozzá a True opciót
-            if len(q["options"]) == 1 and q["options"][0]["text"].lower() in ("false", "hamis"):
-                q["options"].append({"text": "True", "correct": False})
-
-            for opt in q["options"]:
-                if re.search(r"helyes", opt["text"], re.I) or re.search(r"delyes", opt["text"], re.I):
-                    opt["text"] = re.sub(r"(?i)helyes!?|helyes valasz|delyes valasz", "", opt["text"]).strip(" .|")
-                    opt["correct"] = True
-
-            # 16. kérdés speciális: iloc[1] -> második sor értékei
-            if q["header"].startswith("16. kérdés"):
-                q["question"] = "Mit ad vissza az alábbi kód?\ndf = pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]})\nprint(df.iloc[1])"
-                q["options"] = [
-                    {"text": "A második oszlop értékeit.", "correct": False},
-                    {"text": "A sorindexet.", "correct": False},
-                    {"text": "A második sor értékeit.", "correct": True},
-                    {"text": "Hibát ad, mert hibás a szintaxis.", "correct": False},
-                ]
-
-            fixed.append(q)
-        return fixed
+            yield from report(results)
+            return
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(workers, page_count), initializer=_limit_ocr_threads) as pool:
+            yield from report(
+                pool.map(_ocr_page, repeat(pdf_path), range(page_count), repeat(resolution), repeat(cache_path))
+            )
+
+    def report(results: Iterator[tuple[str, float, float, bool]]) -> Iterator[str]:
+        for idx, (text, raster_s, ocr_s, cached) in enumerate(results):
+            _stage_record("rasterize", raster_s, pdf=pdf_path.name, page=idx)
+            _stage_record("ocr_cache_hit" if cached else "ocr", ocr_s, pdf=pdf_path.name, page=idx, count=len(text))
+            if report_timing:
+                source = "cached" if cached else f"OCR {ocr_s:.2f}s"
+                print(
+                    f"{pdf_path.name} page {idx + 1} @ {resolution} dpi: "
+                    f"rasterize {raster_s:.2f}s, {source}, {len(text)} chars"
+                )
+            yield text
+
+    def ocr_text() -> str:
+        return "\n\n".join(ocr_pages())
 
     ocr_txt = ocr_text()
-    return fixups(parse_blocks(ocr_txt))
+    started = _stage_start()
+    questions = parse_kviz12_text(ocr_txt)
+    _stage_end(started, "ocr_parse_blocks", pdf_path.name, count=len(questions))
+    return questions
 
 
-def parse_pdf(path: Path) -> list[dict]:
-    if "beugro" in path.stem.lower() or "telekom" in path.stem.lower():
-        return parse_beugro_telekom(path)
-    if path.name.lower().startswith("kviz12"):
-        return parse_kviz12_ocr(path)
+class PdfDocument:
+    """Egy PDF, egyszer beolvasva és megosztva a felismerés és a parserek között.
 
-    try:
-        from pypdf import PdfReader  # type: ignore
-    except Exception:
-        from PyPDF2 import PdfReader  # type: ignore
+    A fájl bájtjai egyszer kerülnek beolvasásra; a pypdf- és a pdfplumber-nézet csak első
+    használatkor készül el ugyanabból a pufferből. Az oldalankénti szöveg és raszterkép
+    memoizált (a karakterek és téglalapok a pdfplumber oldalobjektumain maradnak
+    gyorsítótárazva), :meth:`release_page` pedig elengedi egy oldal összes adatát.
+    """
 
-    reader = PdfReader(str(path))
-    text = "\n".join((page.extract_text() or "") for page in reader.pages)
-    blocks = re.split(r"(?=\d+ / \d+ pont \d+\. kérdés)", text)
-    return [parse_block(b) for b in blocks[1:]]
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._texts: dict[int, str] = {}
+        self._images: dict[tuple[int, int], object] = {}
 
+    def __enter__(self) -> "PdfDocument":
+        return self
 
-def _normalize_lines(text: str) -> list[str]:
-    raw_lines = [l.rstrip() for l in text.splitlines()]
-    lines: list[str] = []
-    for line in raw_lines:
-        if not line.strip():
-            continue
-        # collapse excessive whitespace but keep bullets
-        line = re.sub(r"\s+", " ", line).strip()
-        lines.append(line)
-
-    # join broken words like "vár" + "akozik" (OCR/text-extraction line wraps)
-    joined: list[str] = []
-    for line in lines:
-        if not joined:
-            joined.append(line)
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @cached_property
+    def data(self) -> bytes:
+        return self.path.read_bytes()
+
+    @cached_property
+    def reader(self):
+        try:
+            from pypdf import PdfReader  # type: ignore
+        except Exception:
+            from PyPDF2 import PdfReader  # type: ignore
+
+        return PdfReader(io.BytesIO(self.data))
+
+    @cached_property
+    def plumber(self):
+        import pdfplumber  # optional dependency (layout and raster access)
+
+        return pdfplumber.open(io.BytesIO(self.data))
+
+    @cached_property
+    def page_count(self) -> int:
+        # Use whichever view is already open.
+        if "plumber" in self.__dict__:
+            return len(self.plumber.pages)
+        return len(self.reader.pages)
+
+    @cached_property
+    def metadata(self) -> dict[str, str]:
+        return {str(k): str(v) for k, v in (self.reader.metadata or {}).items()}
+
+    def text(self, index: int) -> str:
+        if index not in self._texts:
+            self._texts[index] = self.reader.pages[index].extract_text() or ""
+        return self._texts[index]
+
+    def page(self, index: int):
+        """A pdfplumber-oldal (``chars``, ``rects`` ...), amelyet minden parser közösen használ."""
+        return self.plumber.pages[index]
+
+    def chars(self, index: int) -> list[dict]:
+        return self.page(index).chars
+
+    def rects(self, index: int) -> list[dict]:
+        return self.page(index).rects
+
+    def image(self, index: int, resolution: int):
+        key = (index, resolution)
+        if key not in self._images:
+            self._images[key] = self.page(index).to_image(resolution=resolution).original  # PIL Image
+        return self._images[key]
+
+    def release_page(self, index: int) -> None:
+        self._texts.pop(index, None)
+        for key in [key for key in self._images if key[0] == index]:
+            del self._images[key]
+        if "plumber" in self.__dict__:
+            page = self.plumber.pages[index]
+            # pdfplumber >= 0.11 can drop a page's parsed layout objects.
+            release = getattr(page, "close", None) or getattr(page, "flush_cache", None)
+            if release is not None:
+                release()
+
+    def close(self) -> None:
+        self._texts.clear()
+        self._images.clear()
+        if "plumber" in self.__dict__:
+            self.plumber.close()
+
+
+def as_document(source: "PdfDocument | Path") -> PdfDocument:
+    return source if isinstance(source, PdfDocument) else PdfDocument(Path(source))
+
+
+@lru_cache(maxsize=1)
+def _worker_document(path: Path) -> PdfDocument:
+    # Page-level worker processes keep the document open across the pages they are handed.
+    return PdfDocument(path)
+
+
+class PdfProbe:
+    """Olcsó, lustán kiszámolt jellemzők a formátum felismeréséhez (fájlnév, első oldal szövege, metaadatok)."""
+
+    def __init__(self, document: PdfDocument) -> None:
+        self.document = document
+        self.path = document.path
+        self.stem = self.path.stem.lower()
+        self.name = self.path.name.lower()
+
+    @cached_property
+    def first_page_text(self) -> str:
+        return self.document.text(0) if self.document.page_count else ""
+
+    @cached_property
+    def metadata(self) -> dict[str, str]:
+        return self.document.metadata
+
+
+@dataclass(frozen=True)
+class ParserSpec:
+    name: str
+    description: str
+    # Each entry is a group of interchangeable import names; one of them must be installed.
+    backends: tuple[tuple[str, ...], ...]
+    parse: Callable[..., list[Question]]
+    # None marks the fallback parser used when no other format matches.
+    sniff: Callable[[PdfProbe], bool] | None = None
+    executables: tuple[str, ...] = ()
+
+
+PARSERS: list[ParserSpec] = []
+
+
+def register_parser(spec: ParserSpec) -> ParserSpec:
+    """Új PDF-formátum regisztrálása; a felismerés a regisztráció sorrendjében történik."""
+    PARSERS.append(spec)
+    return spec
+
+
+def select_parser(source: "PdfDocument | Path") -> ParserSpec:
+    probe = PdfProbe(as_document(source))
+    fallback = None
+    for spec in PARSERS:
+        if spec.sniff is None:
+            fallback = fallback or spec
+        elif spec.sniff(probe):
+            return spec
+    if fallback is None:
+        raise ValueError(f"No parser recognizes {probe.path}")
+    return fallback
+
+
+def missing_backends(spec: ParserSpec) -> list[str]:
+    # find_spec locates a top-level package without importing it, so this stays cheap.
+    missing = [
+        "/".join(group)
+        for group in spec.backends
+        if not any(importlib.util.find_spec(name) is not None for name in group)
+    ]
+    missing.extend(f"{exe} (executable)" for exe in spec.executables if shutil.which(exe) is None)
+    return missing
+
+
+def iter_generic_blocks(page_texts: Iterable[str], pdf: str | None = None) -> Iterator[str]:
+    """Kérdésblokkok kiadása oldalanként olvasva, amint a következő fejléc lezárja őket.
+
+    Ugyanazokat a blokkokat adja, mint az oldalak ``"\\n"``-nel összefűzött szövegének felosztása
+    (a bevezető rész nélkül), de csak a még nyitott blokk szövege marad pufferben.
+    """
+    # The header pattern cannot match across the "\n" that joins pages, so a header found in the
+    # buffer is final and everything before the last one is a closed block.
+    tail: str | None = None
+    for idx, text in enumerate(page_texts):
+        started = _stage_start()
+        parts = RE_GENERIC_BLOCK_START.split(text if tail is None else tail + "\n" + text)[1:]
+        _stage_end(started, "block_split", pdf, idx, count=max(len(parts) - 1, 0))
+        if not parts:
             continue
+        yield from parts[:-1]
+        tail = parts[-1]
+    if tail is not None:
+        yield tail
+
+
+def parse_generic_pdf(source: "PdfDocument | Path") -> list[Question]:
+    doc = as_document(source)
+    path = doc.path
+
+    def page_texts() -> Iterator[str]:
+        for idx in range(doc.page_count):
+            started = _stage_start()
+            text = doc.text(idx)
+            _stage_end(started, "pdf_text", path.name, idx, count=len(text))
+            yield text
+            # The block splitter has consumed the page; do not keep its text until close().
+            doc.release_page(idx)
+
+    questions: list[Question] = []
+    for block in iter_generic_blocks(page_texts(), path.name):
+        started = _stage_start()
+        questions.append(parse_block(block))
+        _stage_end(started, "parse_block", path.name, count=1)
+    return questions
 
-        prev = joined[-1]
-        # If previous ends with a lowercase letter and current begins with lowercase,
-        # and current is not a bullet and not a new question number, join without space.
-        if (
-            re.search(r"[a-záéíóöőúüű]$", prev)
-            and re.match(r"^[a-záéíóöőúüű]", line)
-            and not line.startswith("•")
-            and not re.match(r"^\d+\.", line)
-        ):
-            joined[-1] = prev + line
-        else:
-            joined.append(line)
-    return joined
+
+def _parse_kviz12(
+    doc: PdfDocument,
+    ocr_resolution: int = OCR_RESOLUTION,
+    ocr_workers: int = 1,
+    ocr_timing: bool = False,
+    ocr_cache: Path | None = None,
+    **_,
+) -> list[Question]:
+    return parse_kviz12_ocr(
+        doc, resolution=ocr_resolution, workers=ocr_workers, report_timing=ocr_timing, cache_path=ocr_cache
+    )
 
 
-def parse_beugro_telekom(pdf_path: Path) -> list[dict]:
+register_parser(
+    ParserSpec(
+        name="telekom",
+        description="Beugró/telekom answer keys (pdfplumber layout, green highlights); file name contains beugro/telekom.",
+        backends=(("pdfplumber",),),
+        parse=lambda doc, **_: parse_beugro_telekom(doc),
+        sniff=lambda probe: "beugro" in probe.stem or "telekom" in probe.stem,
+    )
+)
+register_parser(
+    ParserSpec(
+        name="kviz12-ocr",
+        description="Scanned quiz printouts read with Tesseract OCR; file name starts with kviz12.",
+        backends=(("pdfplumber",), ("pytesseract",)),
+        parse=_parse_kviz12,
+        sniff=lambda probe: probe.name.startswith("kviz12"),
+        executables=("tesseract",),
+    )
+)
+register_parser(
+    ParserSpec(
+        name="generic",
+        description='Moodle quiz exports split on "<n> / <m> pont <k>. kérdés" headers (fallback).',
+        backends=(("pypdf", "PyPDF2"),),
+        parse=lambda doc, **_: parse_generic_pdf(doc),
+    )
+)
+
+
+def parse_pdf(
+    path: Path,
+    ocr_resolution: int = OCR_RESOLUTION,
+    ocr_workers: int = 1,
+    ocr_timing: bool = False,
+    ocr_cache: Path | None = None,
+) -> list[Question]:
+    # One document per PDF: the format probe and the parser share the bytes and the decoded pages.
+    with PdfDocument(path) as doc:
+        spec = select_parser(doc)
+        return spec.parse(
+            doc, ocr_resolution=ocr_resolution, ocr_workers=ocr_workers, ocr_timing=ocr_timing, ocr_cache=ocr_cache
+        )
+
+
+def parse_beugro_telekom(source: "PdfDocument | Path") -> list[Question]:
     """Telekommunikációs beugró kvízkérdések PDF feldolgozása.
 
     A dokumentum sokszor tartalmazza a helyes megoldást sima szövegként az opciók után.
     Amikor nem szerepel megoldás a szövegben, a kérdéshez hozzáadunk egy jelző opciót.
     """
+    return list(iter_beugro_telekom(source))
 
-    import pdfplumber  # optional dependency (used for this PDF's extraction)
+
+def iter_beugro_telekom(source: "PdfDocument | Path") -> Iterator[Question]:
+    """A :func:`parse_beugro_telekom` kérdései oldalanként feldolgozva, ahogy elkészülnek.
+
+    Egyszerre csak egy oldal sorai és a még nyitott kérdésblokk van memóriában; a feldolgozott
+    oldal pdfplumber-objektumait azonnal elengedjük, így a csúcsmemória nagy PDF-eknél sem nő.
+    """
+
+    doc = as_document(source)
+    pdf_path = doc.path
 
     HIGHLIGHT_GREEN = (0.0, 1.0, 0.0)
     GAP_THRESHOLD = 25.0
+    RECT_BAND_HEIGHT = 20.0
 
     def overlaps(a: tuple[float, float, float, float], b: tuple[float, float, float, float]) -> bool:
         ax0, ay0, ax1, ay1 = a
         bx0, by0, bx1, by1 = b
         return not (ax1 <= bx0 or bx1 <= ax0 or ay1 <= by0 or by1 <= ay0)
 
+    def bands(y0: float, y1: float) -> range:
+        return range(int(y0 // RECT_BAND_HEIGHT), int(y1 // RECT_BAND_HEIGHT) + 1)
+
+    def index_rects(
+        rects: list[tuple[float, float, float, float]],
+    ) -> dict[int, list[tuple[float, float, float, float]]]:
+        # Bucket rects by horizontal band so a line only tests the rects sharing its bands.
+        index: dict[int, list[tuple[float, float, float, float]]] = {}
+        for rr in rects:
+            for band in bands(rr[1], rr[3]):
+                index.setdefault(band, []).append(rr)
+        return index
+
+    def is_highlighted(
+        bbox: tuple[float, float, float, float], index: dict[int, list[tuple[float, float, float, float]]]
+    ) -> bool:
+        for band in bands(bbox[1], bbox[3]):
+            for rr in index.get(band, ()):
+                if overlaps(bbox, rr):
+                    return True
+        return False
+
     def clean_text(s: str) -> str:
         s = s.replace("\n", "")
-        s = re.sub(r"\s+", " ", s)
+        s = RE_WHITESPACE.sub(" ", s)
         return s.strip()
 
-    def segment_row(chars: list[dict]) -> list[list[dict]]:
-        # Split a single y-row into segments when there's a big x gap (prevents merging columns).
-        if not chars:
-            return []
-        chars = sorted(chars, key=lambda c: float(c["x0"]))
-        segs: list[list[dict]] = [[chars[0]]]
-        for ch in chars[1:]:
-            prev = segs[-1][-1]
-            gap = float(ch["x0"]) - float(prev["x1"])
-            if gap > GAP_THRESHOLD:
-                segs.append([ch])
-            else:
-                segs[-1].append(ch)
-        return segs
-
-    def line_objects_for_page(page, page_index: int) -> list[dict]:
-        rows: dict[float, list[dict]] = {}
-        for ch in page.chars:
+    def char_segments(chars: list[dict]) -> list[tuple[str, tuple[float, float, float, float]]]:
+        # Group chars into rows by rounded top, then split each row into segments at big x gaps
+        # (prevents merging columns). Returns the raw segment text and bbox in reading order.
+        texts: list[str] = []
+        cols: list[tuple[float, float, float, float, float]] = []  # row, x0, x1, top, bottom
+        for ch in chars:
             t = ch.get("text", "")
             if not t or t == "\n":
                 continue
-            top = round(float(ch["top"]), 1)
-            rows.setdefault(top, []).append(ch)
+            top = float(ch["top"])
+            texts.append(t)
+            cols.append((round(top, 1), float(ch["x0"]), float(ch["x1"]), top, float(ch["bottom"])))
+        if not cols:
+            return []
 
+        try:
+            import numpy as np  # optional dependency (vectorized layout)
+        except ImportError:
+            np = None
+
+        if np is None:
+            order = sorted(range(len(cols)), key=lambda i: (cols[i][0], cols[i][1]))
+            segs: list[tuple[str, tuple[float, float, float, float]]] = []
+            seg_text: list[str] = []
+            seg_box: list[float] = []
+            prev: tuple[float, float, float, float, float] | None = None
+            for i in order:
+                row, x0, x1, top, bottom = cols[i]
+                if prev is not None and (row != prev[0] or x0 - prev[2] > GAP_THRESHOLD):
+                    segs.append(("".join(seg_text), (seg_box[0], seg_box[1], seg_box[2], seg_box[3])))
+                    prev = None
+                if prev is None:
+                    seg_text = [texts[i]]
+                    seg_box = [x0, top, x1, bottom]
+                else:
+                    seg_text.append(texts[i])
+                    seg_box[0] = min(seg_box[0], x0)
+                    seg_box[1] = min(seg_box[1], top)
+                    seg_box[2] = max(seg_box[2], x1)
+                    seg_box[3] = max(seg_box[3], bottom)
+                prev = cols[i]
+            segs.append(("".join(seg_text), (seg_box[0], seg_box[1], seg_box[2], seg_box[3])))
+            return segs
+
+        arr = np.array(cols, dtype=float)
+        # lexsort is stable, so chars sharing a row and x0 keep their page.chars order.
+        idx = np.lexsort((arr[:, 1], arr[:, 0]))
+        arr = arr[idx]
+        breaks = np.empty(len(arr), dtype=bool)
+        breaks[0] = True
+        breaks[1:] = (arr[1:, 0] != arr[:-1, 0]) | (arr[1:, 1] - arr[:-1, 2] > GAP_THRESHOLD)
+        starts = np.flatnonzero(breaks)
+        x0s = np.minimum.reduceat(arr[:, 1], starts).tolist()
+        x1s = np.maximum.reduceat(arr[:, 2], starts).tolist()
+        y0s = np.minimum.reduceat(arr[:, 3], starts).tolist()
+        y1s = np.maximum.reduceat(arr[:, 4], starts).tolist()
+        ordered = [texts[i] for i in idx.tolist()]
+        ends = starts[1:].tolist() + [len(arr)]
+        return [
+            ("".join(ordered[a:b]), (x0s[k], y0s[k], x1s[k], y1s[k]))
+            for k, (a, b) in enumerate(zip(starts.tolist(), ends))
+        ]
+
+    def line_objects_for_page(page_index: int) -> list[Line]:
+        started = _stage_start()
+        chars = doc.chars(page_index)
+        page_rects = doc.rects(page_index)
+        _stage_end(started, "page_objects", pdf_path.name, page_index, count=len(chars))
+
+        started = _stage_start()
         rects: list[tuple[float, float, float, float]] = []
-        for r in page.rects:
+        for r in page_rects:
             if r.get("non_stroking_color") == HIGHLIGHT_GREEN:
                 rects.append((float(r["x0"]), float(r["top"]), float(r["x1"]), float(r["bottom"])))
+        rect_index = index_rects(rects)
 
-        out: list[dict] = []
-        for top in sorted(rows.keys()):
-            for seg in segment_row(rows[top]):
-                text = clean_text("".join(c["text"] for c in seg))
-                if not text:
-                    continue
-                x0 = min(float(c["x0"]) for c in seg)
-                x1 = max(float(c["x1"]) for c in seg)
-                y0 = min(float(c["top"]) for c in seg)
-                y1 = max(float(c["bottom"]) for c in seg)
-                bbox = (x0, y0, x1, y1)
-                highlighted = any(overlaps(bbox, rr) for rr in rects) if rects else False
-                out.append({"page": page_index, "text": text, "bbox": bbox, "highlight": highlighted})
-        return out
-
-    doc_lines: list[dict] = []
-    with pdfplumber.open(str(pdf_path)) as pdf:
-        for idx, page in enumerate(pdf.pages):
-            doc_lines.extend(line_objects_for_page(page, idx))
-
-    # Merge bullet-only lines: PDFs often store "•" on its own line.
-    merged: list[dict] = []
-    i = 0
-    while i < len(doc_lines):
-        cur = doc_lines[i]
-        if cur["text"] == "•" and i + 1 < len(doc_lines):
-            nxt = doc_lines[i + 1]
-            # merge only if it's on the same page and next isn't a new question header or another bullet
-            if nxt["page"] == cur["page"] and nxt["text"] != "•" and not re.match(r"^\d+\.", nxt["text"]):
-                x0 = min(cur["bbox"][0], nxt["bbox"][0])
-                y0 = min(cur["bbox"][1], nxt["bbox"][1])
-                x1 = max(cur["bbox"][2], nxt["bbox"][2])
-                y1 = max(cur["bbox"][3], nxt["bbox"][3])
-                merged_bbox = (x0, y0, x1, y1)
-                merged.append(
-                    {
-                        "page": cur["page"],
-                        "text": f"• {nxt['text']}".strip(),
-                        "bbox": merged_bbox,
-                        "highlight": bool(cur["highlight"] or nxt["highlight"]),
-                    }
-                )
-                i += 2
+        out: list[Line] = []
+        for raw, bbox in char_segments(chars):
+            text = clean_text(raw)
+            if not text:
                 continue
-        merged.append(cur)
-        i += 1
-
-    # Now parse using the merged line texts.
-    lines = _normalize_lines("\n".join(l["text"] for l in merged))
-
-    # Group into question blocks based on real question headers at line start: "<num>. "
-    # Build blocks from merged line objects (so we preserve highlight flags for options)
-    blocks: list[tuple[str, list[dict]]] = []
-    current_num: str | None = None
-    current_block: list[dict] = []
-
-    for obj in merged:
-        line = obj["text"]
-        m = re.match(r"^(\d+)\.\s*(.*)$", line)
-        if m:
-            if current_num is not None:
-                blocks.append((current_num, current_block))
-            current_num = m.group(1)
-            rest = m.group(2).strip()
-            current_block = [{**obj, "text": rest} if rest else obj]
-        elif current_num is not None:
-            current_block.append(obj)
+            highlighted = is_highlighted(bbox, rect_index) if rect_index else False
+            out.append(Line(page_index, text, bbox, highlighted, classify_line(text)))
+        _stage_end(started, "char_layout", pdf_path.name, page_index, count=len(out))
+        return out
 
-    if current_num is not None:
-        blocks.append((current_num, current_block))
+    def merge_bullets(page_lines: list[Line]) -> list[Line]:
+        # Merge bullet-only lines: PDFs often store "•" on its own line. Only lines of the same
+        # page are merged, so this works one page at a time.
+        merged: list[Line] = []
+        i = 0
+        while i < len(page_lines):
+            cur = page_lines[i]
+            if cur.text == "•" and i + 1 < len(page_lines):
+                nxt = page_lines[i + 1]
+                # merge only if next isn't a new question header or another bullet
+                if nxt.text != "•" and nxt.kind != LINE_HEADER:
+                    x0 = min(cur.bbox[0], nxt.bbox[0])
+                    y0 = min(cur.bbox[1], nxt.bbox[1])
+                    x1 = max(cur.bbox[2], nxt.bbox[2])
+                    y1 = max(cur.bbox[3], nxt.bbox[3])
+                    merged_bbox = (x0, y0, x1, y1)
+                    merged.append(
+                        Line(cur.page, f"• {nxt.text}".strip(), merged_bbox, cur.highlight or nxt.highlight, LINE_BULLET)
+                    )
+                    i += 2
+                    continue
+            merged.append(cur)
+            i += 1
+        return merged
 
-    questions: list[dict] = []
-    for num, body_objs in blocks:
-        body_objs = [o for o in body_objs if o.get("text", "").strip()]
+    def parse_question(num: str, body_objs: list[Line]) -> Question | None:
+        body_objs = [o for o in body_objs if o.text.strip()]
         if not body_objs:
-            continue
+            return None
 
         question_lines: list[str] = []
         option_lines: list[str] = []
@@ -418,11 +1040,11 @@ def parse_beugro_telekom(pdf_path: Path) -> list[dict]:
         question_ended = False
 
         for obj in body_objs:
-            line = obj["text"].strip()
-            if line.startswith("•"):
+            line = obj.text.strip()
+            if obj.kind == LINE_BULLET:
                 in_options = True
                 option_lines.append(line.lstrip("•").strip())
-                option_correct_by_highlight.append(bool(obj.get("highlight")))
+                option_correct_by_highlight.append(obj.highlight)
                 continue
 
             if in_options:
@@ -443,26 +1065,23 @@ def parse_beugro_telekom(pdf_path: Path) -> list[dict]:
         # Some rows use " / " to repeat phrasing; keep it as-is.
 
         # Build options in the app's expected format.
-        options: list[dict] = []
+        options: list[Option] = []
         explanation = PLACEHOLDER_EXPLANATION
 
         tf_answer = None
         if answer_text:
-            if re.match(r"^igaz\b", answer_text, flags=re.I):
+            if RE_TF_IGAZ.match(answer_text):
                 tf_answer = "Igaz"
-            elif re.match(r"^hamis\b", answer_text, flags=re.I):
+            elif RE_TF_HAMIS.match(answer_text):
                 tf_answer = "Hamis"
 
-        if tf_answer is not None or re.match(r"^igaz vagy hamis\?", question_text, flags=re.I):
+        if tf_answer is not None or RE_TF_QUESTION.match(question_text):
             correct_is_igaz = tf_answer == "Igaz"
-            options = [
-                {"text": "Igaz", "correct": bool(correct_is_igaz)},
-                {"text": "Hamis", "correct": bool(tf_answer == "Hamis")},
-            ]
+            options = [Option("Igaz", correct_is_igaz), Option("Hamis", tf_answer == "Hamis")]
             if tf_answer is None:
-                explanation = "A PDF-ben ehhez a kérdéshez nem szerepel jelölt megoldás."
+                explanation = EXPLANATION_NO_MARKED_SOLUTION
                 # Ensure at least one correct option so the UI can show a solution.
-                options[0]["correct"] = True
+                options[0].correct = True
         elif option_lines:
             # Create MC options; try to match an explicit answer line to one of the options.
             lowered_answer = answer_text.lower() if answer_text else ""
@@ -480,68 +1099,83 @@ def parse_beugro_telekom(pdf_path: Path) -> list[dict]:
                     ):
                         is_correct = True
                         matched = True
-                options.append({"text": opt, "correct": is_correct})
+                options.append(Option(opt, is_correct))
 
             if not matched:
                 if answer_text:
-                    options.append({"text": answer_text, "correct": True})
+                    options.append(Option(answer_text, True))
                 else:
-                    options.append({"text": "A PDF nem tartalmazza a megoldást.", "correct": True})
-                    explanation = "A PDF-ben ehhez a kérdéshez nem szerepel jelölt megoldás."
+                    options.append(Option(PLACEHOLDER_NO_SOLUTION, True))
+                    explanation = EXPLANATION_NO_MARKED_SOLUTION
         else:
             # No explicit options -> treat as a short-answer flashcard.
             if answer_text:
-                options = [{"text": answer_text, "correct": True}]
+                options = [Option(answer_text, True)]
             else:
-                options = [{"text": "Szabad szöveges válasz", "correct": True}]
-                explanation = "A PDF-ben ehhez a kérdéshez nem szerepel megoldás."
-
-        questions.append(
-            {
-                "header": f"{num}.",
-                "question": question_text,
-                "options": options,
-                "explanation": explanation,
-            }
-        )
+                options = [Option(PLACEHOLDER_FREE_TEXT, True)]
+                explanation = EXPLANATION_NO_SOLUTION
 
-    return questions
+        return Question(question_text, options, f"{num}.", explanation)
+
+    # Group into question blocks based on real question headers at line start: "<num>. "
+    # Only the block that is still open is carried over to the next page.
+    current_num: str | None = None
+    current_block: list[Line] = []
+    # Count pages on the pdfplumber view: page_count would open (and decode) the pypdf view too.
+    for idx in range(len(doc.plumber.pages)):
+        page_lines = line_objects_for_page(idx)
+        doc.release_page(idx)  # drop pdfplumber's chars/rects/layout for this page
+
+        started = _stage_start()
+        finished: list[tuple[str, list[Line]]] = []
+        for obj in merge_bullets(page_lines):
+            m = RE_NUMBERED_HEADER.match(obj.text) if obj.kind == LINE_HEADER else None
+            if m:
+                if current_num is not None:
+                    finished.append((current_num, current_block))
+                current_num = m.group(1)
+                rest = m.group(2).strip()
+                current_block = [replace(obj, text=rest, kind=classify_line(rest)) if rest else obj]
+            elif current_num is not None:
+                current_block.append(obj)
+        _stage_end(started, "line_grouping", pdf_path.name, idx, count=len(finished))
+
+        started = _stage_start()
+        questions = [q for q in (parse_question(num, body) for num, body in finished) if q is not None]
+        _stage_end(started, "block_parse", pdf_path.name, idx, count=len(questions))
+        yield from questions
+
+    if current_num is not None:
+        question = parse_question(current_num, current_block)
+        if question is not None:
+            yield question
 
 
-def fix_missing_answers(entry: dict) -> dict:
+def fix_missing_answers(entry: Question) -> Question:
     """Ad-hoc kiegészítések azokra a kérdésekre, ahol a PDF-ben nincs jelölt válasz."""
-    if any(opt["correct"] for opt in entry["options"]):
+    if any(opt.correct for opt in entry.options):
         return entry
 
-    qlower = entry["question"].lower()
+    qlower = entry.question.lower()
 
     if "rekurzív  lambda" in qlower and "factor" in qlower:
-        entry["options"] = [
-            {"text": "factor = lambda a: 1 if a <= 1 else a * factor(a - 1)", "correct": True}
-        ]
+        entry.options = [Option("factor = lambda a: 1 if a <= 1 else a * factor(a - 1)", True)]
     elif "páratlan voltának" in qlower and "is_odd" in qlower:
-        entry["options"] = [{"text": "is_odd = lambda a: a % 2 == 1", "correct": True}]
-    elif "range (7, 10, -1)" in entry["question"]:
-        entry["options"] = [
-            {"text": "Error, mert nem lehet -1 lépésekkel eljutni 7-ből 10-be", "correct": True}
-        ]
-    elif "def a(**b)" in entry["question"]:
-        entry["options"] = [
-            {
-                "text": "ár: 123000\n    darab: 2\n    Nincs fizetési mód megadva.",
-                "correct": True,
-            }
-        ]
+        entry.options = [Option("is_odd = lambda a: a % 2 == 1", True)]
+    elif "range (7, 10, -1)" in entry.question:
+        entry.options = [Option("Error, mert nem lehet -1 lépésekkel eljutni 7-ből 10-be", True)]
+    elif "def a(**b)" in entry.question:
+        entry.options = [Option("ár: 123000\n    darab: 2\n    Nincs fizetési mód megadva.", True)]
     elif "milyen feladatokra használtad eddig a pythont" in qlower:
-        entry["options"] = [{"text": "Szabad szöveges válasz (reflexiós kérdés)", "correct": True}]
-    elif not entry["options"]:
-        entry["options"] = [{"text": "Szabad szöveges válasz", "correct": True}]
+        entry.options = [Option(PLACEHOLDER_REFLECTION, True)]
+    elif not entry.options:
+        entry.options = [Option(PLACEHOLDER_FREE_TEXT, True)]
 
     return entry
 
 
 def quiz_label(path: Path) -> str:
-    match = re.search(r"Kvíz[- ]?(\d+)", path.stem)
+    match = RE_QUIZ_NUMBER.search(path.stem)
     return f"kviz-{match.group(1)}" if match else path.stem.replace(" ", "-").lower()
 
 
@@ -553,21 +1187,768 @@ def collect_pdfs(input_path: Path) -> list[Path]:
     raise FileNotFoundError(f"Input not found or not a PDF/dir: {input_path}")
 
 
-def build_questions(pdf_files: list[Path]) -> list[dict]:
-    questions: list[dict] = []
+def parser_fingerprint(ocr_resolution: int = OCR_RESOLUTION) -> str:
+    """A feldolgozó kód és a kimenetet befolyásoló beállítások ujjlenyomata."""
+    h = hashlib.sha256()
+    h.update(f"parser-v{PARSER_VERSION}|ocr-dpi={ocr_resolution}|ocr-lang={OCR_LANG}\n".encode())
+    h.update(Path(__file__).read_bytes())
+    return h.hexdigest()
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_key(pdf: Path, fingerprint: str) -> str:
+    # The parser is picked from the file name, so a renamed copy of the same bytes may parse differently.
+    parser = select_parser(pdf).name
+    return hashlib.sha256(f"{file_sha256(pdf)}|{parser}|{fingerprint}".encode()).hexdigest()
+
+
+def cache_load(cache_dir: Path, key: str) -> list[Question] | None:
+    path = cache_dir / f"{key}.json"
+    try:
+        parsed = [Question.from_dict(q) for q in json.loads(path.read_text(encoding="utf-8"))]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    # Refresh mtime so eviction drops the least recently used entries first.
+    os.utime(path)
+    return parsed
+
+
+def cache_store(cache_dir: Path, key: str, parsed: list[Question]) -> None:
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    path = cache_dir / f"{key}.json"
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps([q.to_dict() for q in parsed], ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def cache_evict(cache_dir: Path, max_bytes: int) -> int:
+    """A legrégebben használt bejegyzések törlése, amíg a gyorsítótár a méretkorlát alá nem kerül."""
+    if not cache_dir.is_dir():
+        return 0
+    entries = []
+    for path in cache_dir.glob("*.json"):
+        st = path.stat()
+        entries.append((st.st_mtime, st.st_size, path))
+    entries.sort()
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+    return removed
+
+
+def _timed_parse_pdf(pdf: Path, **parse_kwargs) -> list[Question]:
+    started = _stage_start()
+    parsed = parse_pdf(pdf, **parse_kwargs)
+    _stage_end(started, "parse_pdf", pdf.name, count=len(parsed))
+    return parsed
+
+
+def _profiled_parse_pdf(pdf: Path, **parse_kwargs) -> tuple[list[Question], list[dict]]:
+    # Worker-side entry point: stage records are shipped back with the result.
+    records = enable_profiling()
+    return _timed_parse_pdf(pdf, **parse_kwargs), records
+
+
+def _parse_uncached(pdf_files: list[Path], jobs: int, **parse_kwargs) -> Iterator[list[Question]]:
+    if jobs <= 1 or len(pdf_files) <= 1:
+        for pdf in pdf_files:
+            yield _timed_parse_pdf(pdf, **parse_kwargs)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Executor.map yields results in submission order, so the output stays identical to a serial run.
+    with ProcessPoolExecutor(max_workers=min(jobs, len(pdf_files))) as pool:
+        if _PROFILE is None:
+            yield from pool.map(partial(parse_pdf, **parse_kwargs), pdf_files)
+            return
+        for parsed, records in pool.map(partial(_profiled_parse_pdf, **parse_kwargs), pdf_files):
+            _PROFILE.extend(records)
+            yield parsed
+
+
+def parse_pdfs(
+    pdf_files: list[Path],
+    jobs: int = 1,
+    cache_dir: Path | None = None,
+    rebuild: bool = False,
+    **parse_kwargs,
+) -> Iterator[list[Question]]:
+    """PDF-ek feldolgozása a bemeneti sorrendben, igény szerint párhuzamos folyamatokban.
+
+    Ha ``cache_dir`` meg van adva, a változatlan PDF-ek (azonos SHA-256, kiválasztott parser és
+    feldolgozó-verzió) eredménye a gyorsítótárból jön, csak a többi PDF-et dolgozzuk fel újra.
+    """
+    keys: dict[Path, str] = {}
+    hits: set[Path] = set()
+    if cache_dir is not None:
+        fingerprint = parser_fingerprint(parse_kwargs.get("ocr_resolution", OCR_RESOLUTION))
+        for pdf in pdf_files:
+            started = _stage_start()
+            keys[pdf] = cache_key(pdf, fingerprint)
+            if not rebuild and (cache_dir / f"{keys[pdf]}.json").is_file():
+                hits.add(pdf)
+            _stage_end(started, "cache_lookup", pdf.name, count=int(pdf in hits))
+
+    misses = _parse_uncached([pdf for pdf in pdf_files if pdf not in hits], jobs, **parse_kwargs)
     for pdf in pdf_files:
-        quiz_id = quiz_label(pdf)
-        parsed = parse_pdf(pdf)
-        for idx, q in enumerate(parsed, start=1):
-            q = fix_missing_answers(q)
-            entry = {
-                "id": f"{quiz_id}-q{idx:02d}",
-                "question": q["question"],
-                "options": q["options"],
-                "explanation": PLACEHOLDER_EXPLANATION,
-            }
-            questions.append(entry)
-    return questions
+        parsed = cache_load(cache_dir, keys[pdf]) if pdf in hits else None
+        if parsed is None:
+            parsed = next(misses) if pdf not in hits else _timed_parse_pdf(pdf, **parse_kwargs)
+            if cache_dir is not None:
+                cache_store(cache_dir, keys[pdf], parsed)
+        yield parsed
+
+
+def build_questions(
+    pdf_files: list[Path],
+    jobs: int = 1,
+    cache_dir: Path | None = None,
+    rebuild: bool = False,
+    **parse_kwargs,
+) -> Iterator[dict]:
+    """A kimeneti bejegyzések előállítása PDF-enként, ahogy az egyes fájlok elkészülnek."""
+    parsed_pdfs = parse_pdfs(pdf_files, jobs, cache_dir=cache_dir, rebuild=rebuild, **parse_kwargs)
+    for pdf, parsed in zip(pdf_files, parsed_pdfs):
+        yield from pdf_entries(pdf, parsed)
+
+
+def pdf_entries(pdf: Path, parsed: list[Question]) -> list[dict]:
+    """Egy PDF feldolgozott kérdéseiből a kimeneti bejegyzések (hiányzó válaszok pótlásával)."""
+    quiz_id = quiz_label(pdf)
+    started = _stage_start()
+    unanswered = [not any(o.correct for o in q.options) for q in parsed]
+    parsed = [fix_missing_answers(q) for q in parsed]
+    _stage_end(started, "fix_missing_answers", pdf.name, count=len(parsed))
+    entries = [question_entry(f"{quiz_id}-q{idx:02d}", q) for idx, q in enumerate(parsed, start=1)]
+    if _ENTRY_NOTES is not None:
+        for entry, q, patched in zip(entries, parsed, unanswered):
+            # A fresh list, so re-parsing a PDF (--watch) replaces its notes instead of adding to them.
+            _ENTRY_NOTES[entry["id"]] = notes = []
+            if patched:
+                notes.append("patched")
+            # The T/F fallback marks "Igaz" correct without adding a placeholder option.
+            if q.explanation == EXPLANATION_NO_MARKED_SOLUTION and [o.text for o in q.options] == ["Igaz", "Hamis"]:
+                notes.append("forced_tf")
+    return entries
+
+
+async def _pipeline(
+    pdf_files: list[Path],
+    out: queue.Queue,
+    jobs: int,
+    cache_dir: Path | None,
+    rebuild: bool,
+    queue_size: int,
+    parse_kwargs: dict,
+) -> None:
+    import asyncio
+    from concurrent.futures import ProcessPoolExecutor
+
+    loop = asyncio.get_running_loop()
+    fingerprint = parser_fingerprint(parse_kwargs.get("ocr_resolution", OCR_RESOLUTION)) if cache_dir else None
+    to_parse: asyncio.Queue = asyncio.Queue(queue_size)
+    parsed_q: asyncio.Queue = asyncio.Queue(queue_size)
+    # PDFs between "read" and "emitted": caps the reorder buffer behind a slow PDF.
+    window = asyncio.Semaphore(queue_size + jobs)
+    parse_pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    if parse_pool is None or _PROFILE is None:
+        parse = partial(_timed_parse_pdf, **parse_kwargs)
+    else:
+        parse = partial(_profiled_parse_pdf, **parse_kwargs)
+
+    async def read() -> None:
+        # Stage 1: hash the file and look it up in the cache (I/O, default thread pool).
+        for index, pdf in enumerate(pdf_files):
+            await window.acquire()
+            key = cached = None
+            if cache_dir is not None:
+                started = _stage_start()
+                key = await asyncio.to_thread(cache_key, pdf, fingerprint)
+                if not rebuild:
+                    cached = await asyncio.to_thread(cache_load, cache_dir, key)
+                _stage_end(started, "cache_lookup", pdf.name, count=int(cached is not None))
+            await to_parse.put((index, pdf, key, cached))
+        for _ in range(jobs):
+            await to_parse.put(None)
+
+    async def extract() -> None:
+        # Stage 2: text extraction and block parsing, in worker processes with --jobs > 1.
+        while (item := await to_parse.get()) is not None:
+            index, pdf, key, parsed = item
+            if parsed is None:
+                result = await loop.run_in_executor(parse_pool, parse, pdf)
+                if parse_pool is not None and _PROFILE is not None:
+                    result, records = result
+                    _PROFILE.extend(records)
+                parsed = result
+                if cache_dir is not None:
+                    await asyncio.to_thread(cache_store, cache_dir, key, parsed)
+            await parsed_q.put((index, pdf, parsed))
+
+    async def emit() -> None:
+        # Stage 3: fix_missing_answers and hand-off to the writer, in input order.
+        pending: dict[int, tuple[Path, list[Question]]] = {}
+        for next_index in range(len(pdf_files)):
+            while next_index not in pending:
+                index, pdf, parsed = await parsed_q.get()
+                pending[index] = (pdf, parsed)
+            pdf, parsed = pending.pop(next_index)
+            entries = pdf_entries(pdf, parsed)
+            await asyncio.to_thread(out.put, entries)  # blocks while the writer is behind
+            window.release()
+
+    try:
+        workers = [asyncio.create_task(extract()) for _ in range(jobs)]
+        await asyncio.gather(read(), emit(), *workers)
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown(cancel_futures=True)
+
+
+def build_questions_async(
+    pdf_files: list[Path],
+    jobs: int = 1,
+    cache_dir: Path | None = None,
+    rebuild: bool = False,
+    queue_size: int = 4,
+    **parse_kwargs,
+) -> Iterator[dict]:
+    """Mint a :func:`build_questions`, de asyncio-folyamatban: olvasás/hash, feldolgozás és javítás
+    korlátos sorokkal összekötött, átfedő szakaszokban.
+
+    Egy lassú (pl. OCR-es) PDF nem tartja fel a többi feldolgozását; a kimenet sorrendje
+    ettől még a bemeneti sorrend. A folyamat egy háttérszálban fut, a bejegyzéseket PDF-enként
+    legfeljebb ``queue_size`` tételes sor adja át a hívónak (az íráshoz).
+    """
+    import asyncio
+    import threading
+
+    jobs = max(1, min(jobs, len(pdf_files) or 1))
+    out: queue.Queue = queue.Queue(queue_size)
+    done = object()
+    failure: list[BaseException] = []
+
+    def run() -> None:
+        try:
+            asyncio.run(_pipeline(pdf_files, out, jobs, cache_dir, rebuild, queue_size, parse_kwargs))
+        except BaseException as exc:
+            failure.append(exc)
+        out.put(done)
+
+    thread = threading.Thread(target=run, name="extract-pipeline", daemon=True)
+    thread.start()
+    while (entries := out.get()) is not done:
+        yield from entries
+    thread.join()
+    if failure:
+        raise failure[0]
+
+
+def entry_quiz(qid: str) -> str:
+    """A bejegyzés kvíz-címkéje az azonosítóból (``<quiz_label>-qNN``)."""
+    # Same as matching ^(.+)-q\d+$: only the last "-q" can be followed by nothing but digits.
+    label, sep, number = qid.rpartition("-q")
+    return label if sep and label and number.isdecimal() else "other"
+
+
+def _write_entry(fh, entry: dict, index: int, fmt: str) -> None:
+    if fmt == "ndjson":
+        fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return
+    # Same bytes as json.dumps(list, indent=2): every nested line is shifted by one indent level.
+    fh.write("[\n  " if index == 0 else ",\n  ")
+    fh.write(json.dumps(entry, ensure_ascii=False, indent=2).replace("\n", "\n  "))
+
+
+def _finish_output(fh, count: int, fmt: str) -> None:
+    if fmt == "json":
+        fh.write("\n]" if count else "[]")
+    fh.close()
+
+
+def _temp_path(path: Path) -> Path:
+    return path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+
+def write_questions(
+    questions: Iterable[dict], output_path: Path, fmt: str = "json", shard_dir: Path | None = None
+) -> int:
+    """Bejegyzések folyamatos kiírása (JSON tömb vagy soronként egy objektum, NDJSON).
+
+    Ha ``shard_dir`` meg van adva, ugyanebben a menetben kvízenként külön fájl is készül
+    (``<shard_dir>/<quiz_label>.json``), valamint egy ``_index.json`` áttekintő.
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    suffix = ".ndjson" if fmt == "ndjson" else ".json"
+    if shard_dir is not None:
+        shard_dir.mkdir(parents=True, exist_ok=True)
+
+    count = 0
+    shards: dict[str, list] = {}  # label -> [file handle, entry count, temp path, final path]
+    # Everything goes to temp files first: a failed run must leave the previous output in place.
+    tmp = _temp_path(output_path)
+    fh = tmp.open("w", encoding="utf-8")
+    try:
+        for entry in questions:
+            _write_entry(fh, entry, count, fmt)
+            count += 1
+            if shard_dir is not None:
+                label = entry_quiz(entry["id"])
+                if label not in shards:
+                    shard_path = shard_dir / f"{label}{suffix}"
+                    shard_tmp = _temp_path(shard_path)
+                    shards[label] = [shard_tmp.open("w", encoding="utf-8"), 0, shard_tmp, shard_path]
+                _write_entry(shards[label][0], entry, shards[label][1], fmt)
+                shards[label][1] += 1
+    except BaseException:
+        fh.close()
+        tmp.unlink(missing_ok=True)
+        for shard_fh, _, shard_tmp, _ in shards.values():
+            shard_fh.close()
+            shard_tmp.unlink(missing_ok=True)
+        raise
+    _finish_output(fh, count, fmt)
+    for shard_fh, shard_count, _, _ in shards.values():
+        _finish_output(shard_fh, shard_count, fmt)
+    for _, _, shard_tmp, shard_path in shards.values():
+        os.replace(shard_tmp, shard_path)
+    os.replace(tmp, output_path)
+
+    if shard_dir is not None:
+        index = [{"quiz": label, "file": f"{label}{suffix}", "count": n} for label, (_, n, _, _) in shards.items()]
+        (shard_dir / "_index.json").write_text(json.dumps(index, ensure_ascii=False, indent=2), encoding="utf-8")
+    return count
+
+
+def _compressed_copies(path: Path, data: bytes) -> dict[str, int]:
+    """Előtömörített ``.gz`` (és ha a brotli csomag elérhető, ``.br``) másolat a fájl mellé."""
+    sizes = {}
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    path.with_name(path.name + ".gz").write_bytes(gz)
+    sizes["gzip"] = len(gz)
+    try:
+        import brotli  # optional dependency (precompressed .br decks)
+    except ImportError:
+        return sizes
+    br = brotli.compress(data, quality=11)
+    path.with_name(path.name + ".br").write_bytes(br)
+    sizes["brotli"] = len(br)
+    return sizes
+
+
+def write_deck(questions: list[dict], output_path: Path) -> dict:
+    """Tömör pakli a webes kliensnek a kimenet mellé.
+
+    - ``<stem>.min.json``: minifikált tömb (ugyanaz a séma), előtömörített ``.gz``/``.br`` másolattal;
+    - ``<stem>.chunks/<quiz_label>.json``: kvízenkénti darabok, hogy a kliens az elsővel azonnal indulhasson;
+    - ``<stem>.index.json``: a darabok listája és id -> [darab, bájteltolás, hossz] a ``.min.json``-on belül.
+    """
+    stem = output_path.with_suffix("")
+    chunk_dir = stem.parent / f"{stem.name}.chunks"
+    chunk_dir.mkdir(parents=True, exist_ok=True)
+
+    encoded = [json.dumps(q, ensure_ascii=False, separators=(",", ":")).encode("utf-8") for q in questions]
+    chunks: dict[str, list[int]] = {}
+    for idx, q in enumerate(questions):
+        chunks.setdefault(entry_quiz(q["id"]), []).append(idx)
+
+    ids: dict[str, list[int]] = {}
+    offset = 1  # after the opening "["
+    positions = []
+    for data in encoded:
+        positions.append((offset, len(data)))
+        offset += len(data) + 1  # the "," or closing "]"
+    minified = b"[" + b",".join(encoded) + b"]"
+    min_path = stem.parent / f"{stem.name}.min.json"
+    min_path.write_bytes(minified)
+    sizes = {"minified": len(minified)}
+    sizes.update(_compressed_copies(min_path, minified))
+
+    index_chunks = []
+    for chunk_no, (label, members) in enumerate(chunks.items()):
+        chunk_data = b"[" + b",".join(encoded[i] for i in members) + b"]"
+        chunk_path = chunk_dir / f"{label}.json"
+        chunk_path.write_bytes(chunk_data)
+        _compressed_copies(chunk_path, chunk_data)
+        index_chunks.append({"quiz": label, "file": f"{chunk_dir.name}/{label}.json", "count": len(members)})
+        for i in members:
+            ids[questions[i]["id"]] = [chunk_no, *positions[i]]
+
+    index = {"file": min_path.name, "chunks": index_chunks, "ids": ids}
+    index_path = stem.parent / f"{stem.name}.index.json"
+    index_path.write_text(json.dumps(index, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    sizes["index"] = index_path.stat().st_size
+    return sizes
+
+
+def _parse_seconds(data: bytes, rounds: int = 5) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        json.loads(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# Search index file (see write_search_index): little-endian fixed-size tables, then one UTF-8 string blob.
+SEARCH_INDEX_MAGIC = b"QIDX"
+SEARCH_INDEX_VERSION = 1
+SEARCH_HEADER = struct.Struct("<4sIIIIIQ")  # magic, version, decks, docs, terms, postings, total doc length
+SEARCH_DECK = struct.Struct("<IH")  # name offset, name length
+SEARCH_DOC = struct.Struct("<IHHI")  # id offset, id length, deck number, weighted token count
+SEARCH_TERM = struct.Struct("<IHII")  # term offset, term length, first posting, document frequency
+SEARCH_POSTING = struct.Struct("<IH")  # doc number, weighted term frequency
+SEARCH_QUESTION_WEIGHT = 2  # question tokens count double against option/explanation tokens
+
+
+def fold_accents(text: str) -> str:
+    """Kisbetűs, ékezet nélküli alak (á -> a, ő -> o, ű -> u ...), hogy a keresés ékezetektől függetlenül találjon."""
+    decomposed = unicodedata.normalize("NFD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def search_tokens(text: str) -> list[str]:
+    return RE_WORD.findall(fold_accents(text))
+
+
+def write_search_index(decks: dict[str, list[dict]], path: Path) -> dict:
+    """Fordított index a kérdések, opciók és magyarázatok szavaira, egy mmap-elhető bináris fájlban.
+
+    Felépítés: fejléc, pakli-, dokumentum-, szó- (bájtsorrendben rendezve, így bináris kereséssel
+    és prefixre is kereshető) és előfordulás-tábla fix méretű rekordokkal, végül a szövegek.
+    A lekérdezés a ``scripts/search_questions.py``-ban van.
+    """
+    strings = bytearray()
+
+    def add_string(text: str) -> tuple[int, int]:
+        data = text.encode("utf-8")
+        offset = len(strings)
+        strings.extend(data)
+        return offset, len(data)
+
+    deck_rows = [add_string(name) for name in decks]
+    doc_rows = []
+    postings: dict[str, dict[int, int]] = {}
+    for deck_no, entries in enumerate(decks.values()):
+        for entry in entries:
+            doc = len(doc_rows)
+            weighted = Counter()
+            for token in search_tokens(entry.get("question", "")):
+                weighted[token] += SEARCH_QUESTION_WEIGHT
+            texts = [o.get("text", "") for o in entry.get("options") or []]
+            if entry.get("explanation") and entry["explanation"] != PLACEHOLDER_EXPLANATION:
+                texts.append(entry["explanation"])
+            for text in texts:
+                weighted.update(search_tokens(text))
+            for token, tf in weighted.items():
+                postings.setdefault(token, {})[doc] = min(tf, 0xFFFF)
+            doc_rows.append((*add_string(entry.get("id", "")), deck_no, sum(weighted.values())))
+
+    terms = sorted(postings, key=lambda t: t.encode("utf-8"))
+    term_rows = []
+    posting_rows = []
+    for term in terms:
+        term_rows.append((*add_string(term), len(posting_rows), len(postings[term])))
+        posting_rows.extend(sorted(postings[term].items()))
+
+    out = bytearray(
+        SEARCH_HEADER.pack(
+            SEARCH_INDEX_MAGIC,
+            SEARCH_INDEX_VERSION,
+            len(deck_rows),
+            len(doc_rows),
+            len(term_rows),
+            len(posting_rows),
+            sum(row[3] for row in doc_rows),
+        )
+    )
+    for table, rows in (
+        (SEARCH_DECK, deck_rows),
+        (SEARCH_DOC, doc_rows),
+        (SEARCH_TERM, term_rows),
+        (SEARCH_POSTING, posting_rows),
+    ):
+        for row in rows:
+            out += table.pack(*row)
+    out += strings
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(out)
+    os.replace(tmp, path)  # readers may have the old file mapped
+    return {"docs": len(doc_rows), "terms": len(term_rows), "postings": len(posting_rows), "bytes": len(out)}
+
+
+DEDUPE_SHINGLE = 5
+DEDUPE_PERMUTATIONS = 64
+DEDUPE_BAND_ROWS = 4
+_MINHASH_PRIME = 4294967311  # smallest prime above 2**32
+
+
+def _dedupe_text(text: str) -> str:
+    # Symbols stay: questions that differ only in a formula (x → y vs x ∧ y) are different questions.
+    return " ".join(text.casefold().split())
+
+
+def _shingle_hashes(text: str) -> set[int]:
+    if len(text) <= DEDUPE_SHINGLE:
+        return {zlib.crc32(text.encode("utf-8"))}
+    return {zlib.crc32(text[i : i + DEDUPE_SHINGLE].encode("utf-8")) for i in range(len(text) - DEDUPE_SHINGLE + 1)}
+
+
+def _minhash_signatures(shingle_sets: list[set[int]]) -> list[tuple[int, ...]]:
+    import random
+
+    rng = random.Random(1729)  # fixed, so the LSH buckets are the same on every run
+    coeffs = [(rng.randrange(1, 1 << 31), rng.randrange(0, 1 << 31)) for _ in range(DEDUPE_PERMUTATIONS)]
+    try:
+        import numpy as np  # optional dependency (vectorized minhash)
+    except ImportError:
+        return [
+            tuple(min((a * h + b) % _MINHASH_PRIME for h in hashes) for a, b in coeffs) for hashes in shingle_sets
+        ]
+
+    a = np.array([c[0] for c in coeffs], dtype=np.uint64)[:, None]
+    b = np.array([c[1] for c in coeffs], dtype=np.uint64)[:, None]
+    signatures = []
+    for hashes in shingle_sets:
+        h = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))[None, :]
+        signatures.append(tuple(((a * h + b) % _MINHASH_PRIME).min(axis=1).tolist()))
+    return signatures
+
+
+def dedupe_questions(questions: list[dict], mode: str = "collapse", threshold: float = 0.9) -> tuple[list[dict], dict]:
+    """Pontos és közel azonos kérdések keresése a teljes korpuszon.
+
+    Pontos egyezés (kis- és nagybetűtől és szóközöktől eltekintve azonos kérdés és
+    válaszlehetőség-halmaz) esetén ``collapse`` módban csak az első bejegyzés marad. Ha a két
+    bejegyzés ``correct`` jelölései eltérnek, nem vonjuk össze őket (a megoldókulcs sérülne), hanem
+    ``duplicate_of`` mezővel linkeljük, és ``conflict``-ként számoljuk. A közel azonos kérdéseket
+    (MinHash + LSH jelöltek, Jaccard-hasonlóság ``threshold`` felett) nem vonjuk össze, hanem
+    ``duplicate_of`` mezővel a csoport első bejegyzésére mutatnak; ``link`` módban a pontos
+    egyezésekkel is így teszünk.
+    """
+    stats = {"exact": 0, "conflict": 0, "near": 0}
+    kept: list[dict] = []
+    first_by_signature: dict[tuple, dict] = {}
+    for entry in questions:
+        options = {_dedupe_text(o["text"]): bool(o["correct"]) for o in entry["options"]}
+        signature = (_dedupe_text(entry["question"]), tuple(sorted(options)))
+        first = first_by_signature.get(signature)
+        if first is None:
+            first_by_signature[signature] = entry
+            kept.append(entry)
+            continue
+        first_options = {_dedupe_text(o["text"]): bool(o["correct"]) for o in first["options"]}
+        if first_options != options:
+            # Same question, different answer key: keep both and let the reader decide.
+            stats["conflict"] += 1
+            kept.append({**entry, "duplicate_of": first["id"]})
+            continue
+        stats["exact"] += 1
+        if mode == "link":
+            kept.append({**entry, "duplicate_of": first["id"]})
+            continue
+        if first.get("explanation") == PLACEHOLDER_EXPLANATION and entry.get("explanation"):
+            first["explanation"] = entry["explanation"]
+
+    candidates = [i for i, entry in enumerate(kept) if "duplicate_of" not in entry]
+    shingles = [
+        _shingle_hashes(
+            _dedupe_text(kept[i]["question"] + " " + " ".join(sorted(o["text"] for o in kept[i]["options"])))
+        )
+        for i in candidates
+    ]
+    buckets: dict[tuple, list[int]] = {}
+    for pos, signature in enumerate(_minhash_signatures(shingles)):
+        for band in range(0, DEDUPE_PERMUTATIONS, DEDUPE_BAND_ROWS):
+            buckets.setdefault((band, signature[band : band + DEDUPE_BAND_ROWS]), []).append(pos)
+
+    # Union-find over verified pairs; the root is always the earliest entry of the group.
+    parent = list(range(len(candidates)))
+
+    def root(pos: int) -> int:
+        while parent[pos] != pos:
+            parent[pos] = parent[parent[pos]]
+            pos = parent[pos]
+        return pos
+
+    checked: set[tuple[int, int]] = set()
+    for members in buckets.values():
+        for i, x in enumerate(members):
+            for y in members[i + 1 :]:
+                if (x, y) in checked:
+                    continue
+                checked.add((x, y))
+                union = len(shingles[x] | shingles[y])
+                if union and len(shingles[x] & shingles[y]) / union >= threshold:
+                    rx, ry = root(x), root(y)
+                    if rx != ry:
+                        parent[max(rx, ry)] = min(rx, ry)
+
+    for pos, idx in enumerate(candidates):
+        top = root(pos)
+        if top != pos:
+            kept[idx] = {**kept[idx], "duplicate_of": kept[candidates[top]]["id"]}
+            stats["near"] += 1
+    return kept, stats
+
+
+VALIDATION_FLAGS = (
+    "no_correct",
+    "all_correct",
+    "placeholder",
+    "empty_question",
+    "duplicate_option",
+    "forced_tf",
+    "patched",
+)
+
+
+def validate_questions(questions: list[dict], notes: dict[str, list[str]] | None = None) -> dict:
+    """Minőségi jelentés a teljes korpuszról: jelzők bejegyzésenként és kvíz-címkénként összesítve.
+
+    - ``no_correct`` / ``all_correct``: nincs helyes opció, ill. több opcióból mind helyes;
+    - ``placeholder``: a parserek által beszúrt helykitöltő opció (:data:`PLACEHOLDER_OPTIONS`);
+    - ``empty_question`` / ``duplicate_option``: üres kérdésszöveg, ismétlődő opciószöveg;
+    - ``forced_tf`` / ``patched``: a kényszerített Igaz/Hamis megoldás és a :func:`fix_missing_answers`
+      pótlásai (ezeket a ``notes`` adja, csak a most feldolgozott PDF-ekre).
+    """
+    notes = notes or {}
+    flagged: dict[str, list[str]] = {flag: [] for flag in VALIDATION_FLAGS}
+    no_correct, all_correct, placeholder, empty, duplicate = (flagged[flag] for flag in VALIDATION_FLAGS[:5])
+    ids = []
+    # One tight pass appending ids to per-flag lists; the per-quiz counts are derived from those lists.
+    for entry in questions:
+        qid = entry.get("id", "")
+        ids.append(qid)
+        options = entry.get("options") or []
+        texts = [o.get("text", "").strip() for o in options]
+        correct = sum(map(bool, [o.get("correct") for o in options]))
+        if not correct:
+            no_correct.append(qid)
+        elif correct == len(options) > 1:
+            all_correct.append(qid)
+        if not PLACEHOLDER_OPTIONS.isdisjoint(texts):
+            placeholder.append(qid)
+        if not entry.get("question", "").strip():
+            empty.append(qid)
+        if len({t.casefold() for t in texts}) != len(texts):
+            duplicate.append(qid)
+        for flag in notes.get(qid, ()):
+            flagged[flag].append(qid)
+
+    by_quiz = {label: {"total": total} for label, total in sorted(Counter(map(entry_quiz, ids)).items())}
+    for flag, flag_ids in flagged.items():
+        flag_counts = Counter(map(entry_quiz, flag_ids))
+        for label, counts in by_quiz.items():
+            counts[flag] = flag_counts.get(label, 0)
+
+    return {
+        "total": len(ids),
+        "counts": {flag: len(flag_ids) for flag, flag_ids in flagged.items()},
+        "by_quiz": by_quiz,
+        "entries": flagged,
+    }
+
+
+def merge_questions(
+    existing: list[dict], fresh: list[dict], quiz_ids: set[str]
+) -> tuple[list[dict], dict[str, list[str]]]:
+    """Frissen kinyert kérdések beolvasztása egy meglévő listába, bejegyzésenként.
+
+    A kézzel írt (nem helykitöltő) magyarázatok megmaradnak. Törlésnek csak azok a meglévő
+    bejegyzések számítanak, amelyek a most feldolgozott PDF-ekhez tartoznak; a kézzel
+    felvett, más azonosítójú kérdések érintetlenek maradnak.
+    """
+    fresh_by_id = {q["id"]: q for q in fresh}
+    owned = re.compile(r"^(%s)-q\d+$" % "|".join(re.escape(q) for q in sorted(quiz_ids))) if quiz_ids else None
+
+    merged: list[dict] = []
+    diff: dict[str, list[str]] = {"added": [], "changed": [], "removed": []}
+    seen: set[str] = set()
+    for old in existing:
+        qid = old.get("id", "")
+        new = fresh_by_id.get(qid)
+        if new is None:
+            if owned is not None and owned.match(qid):
+                diff["removed"].append(qid)
+            else:
+                merged.append(old)
+            continue
+
+        seen.add(qid)
+        entry = {**old, **new}
+        explanation = old.get("explanation")
+        if explanation and explanation != PLACEHOLDER_EXPLANATION:
+            entry["explanation"] = explanation
+        if entry["question"] != old.get("question") or entry["options"] != old.get("options"):
+            diff["changed"].append(qid)
+        merged.append(entry)
+
+    for q in fresh:
+        if q["id"] not in seen:
+            merged.append(q)
+            diff["added"].append(q["id"])
+    return merged, diff
+
+
+def load_questions(path: Path, fmt: str = "json") -> list[dict]:
+    """Egy korábbi kimenet beolvasása (JSON tömb vagy soronként egy bejegyzés)."""
+    text = path.read_text(encoding="utf-8")
+    if fmt == "ndjson":
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    return json.loads(text)
+
+
+def _pdf_snapshot(input_path: Path) -> dict[Path, tuple[int, int]]:
+    snapshot = {}
+    for pdf in collect_pdfs(input_path):
+        try:
+            st = pdf.stat()
+        except FileNotFoundError:  # removed between listing and stat
+            continue
+        snapshot[pdf] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+
+def watch_pdfs(
+    input_path: Path, interval: float = 0.5, debounce: float = 0.3
+) -> Iterator[tuple[list[Path], list[Path]]]:
+    """A bemenet figyelése lekérdezéssel; minden lecsendesedett változás után ``(changed, removed)``.
+
+    Egy változás csak akkor jelez, ha a PDF-ek mérete és módosítási ideje ``debounce``
+    másodpercig már nem változik (pl. egy épp másolt vagy mentett fájlnál).
+    """
+    known = _pdf_snapshot(input_path)
+    while True:
+        time.sleep(interval)
+        current = _pdf_snapshot(input_path)
+        if current == known:
+            continue
+        while True:
+            time.sleep(debounce)
+            settled = _pdf_snapshot(input_path)
+            if settled == current:
+                break
+            current = settled
+        changed = sorted(pdf for pdf, stat in current.items() if known.get(pdf) != stat)
+        removed = sorted(pdf for pdf in known if pdf not in current)
+        known = current
+        yield changed, removed
 
 
 def main() -> None:
@@ -584,17 +1965,364 @@ def main() -> None:
         default="questions.json",
         help="Output JSON path (default: questions.json).",
     )
+    parser.add_argument(
+        "--format",
+        choices=("json", "ndjson"),
+        default="json",
+        help="Output format: a JSON array or one question per line (default: json).",
+    )
+    parser.add_argument(
+        "--shard",
+        action="store_true",
+        help="Also write one file per quiz into a directory named after the output (e.g. questions-telekom/).",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of worker processes used to parse PDFs in parallel (default: 1, 0 = all CPUs).",
+    )
+    parser.add_argument(
+        "--pipeline",
+        choices=("sync", "async"),
+        default="sync",
+        help=(
+            "sync: parse PDFs one after another (or in --jobs processes); async: overlap reading/hashing, "
+            "parsing and fixing in an asyncio pipeline with bounded queues (same output)."
+        ),
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=4,
+        help="With --pipeline async: PDFs buffered between stages (default: 4).",
+    )
+    parser.add_argument(
+        "--ocr-dpi",
+        type=int,
+        default=OCR_RESOLUTION,
+        help=f"Rasterization resolution for OCR-parsed PDFs (default: {OCR_RESOLUTION}).",
+    )
+    parser.add_argument(
+        "--ocr-workers",
+        type=int,
+        default=0,
+        help=(
+            "Number of pages rasterized and OCR'd concurrently per PDF "
+            "(default: 0 = all CPUs divided by --jobs, at least 1)."
+        ),
+    )
+    parser.add_argument(
+        "--ocr-timing",
+        action="store_true",
+        help="Print rasterization and OCR time for every page.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help=f"Directory for cached per-PDF parse results (default: {DEFAULT_CACHE_DIR}).",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=DEFAULT_CACHE_MAX_MB,
+        help=f"Evict least recently used cache entries above this size (default: {DEFAULT_CACHE_MAX_MB} MB).",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Neither read nor write the parse cache or the OCR page cache."
+    )
+    parser.add_argument(
+        "--no-ocr-cache",
+        action="store_true",
+        help=f"Do not use the per-page OCR cache (<cache-dir>/{OCR_CACHE_FILENAME}); --rebuild still uses it.",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Ignore cached results and re-parse every PDF (the cache is refreshed).",
+    )
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help=(
+            "Merge into the existing output instead of overwriting it: keep hand-written explanations and "
+            "report added/changed/removed ids. Unchanged PDFs are served from the cache."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="REPORT",
+        help="Record wall/CPU time per stage, PDF and page; write a JSON report here and print a summary table.",
+    )
+    parser.add_argument(
+        "--profile-capture",
+        action="append",
+        choices=("cprofile", "tracemalloc"),
+        help=(
+            "With --profile: also run cProfile (stats saved next to the report as .prof) or tracemalloc "
+            "(top allocations added to the report). Only the main process is captured. Repeatable."
+        ),
+    )
+    parser.add_argument(
+        "--profile-top", type=int, default=15, help="Rows shown in the --profile summary tables (default: 15)."
+    )
+    parser.add_argument(
+        "--deck",
+        action="store_true",
+        help=(
+            "Also write a compact deck for the web app next to the output: <stem>.min.json (+ .gz/.br), "
+            "per-quiz chunks in <stem>.chunks/ and an id/chunk index in <stem>.index.json "
+            "(the app loads it with ?chunks=1 or when the topic sets index)."
+        ),
+    )
+    parser.add_argument(
+        "--search-index",
+        metavar="PATH",
+        help="Also write an accent-insensitive search index of the output (query it with scripts/search_questions.py).",
+    )
+    parser.add_argument(
+        "--dedupe",
+        choices=("collapse", "link"),
+        help=(
+            "Find duplicate questions across all PDFs. collapse: drop exact duplicates; link: keep them. "
+            "Exact duplicates with a different answer key, and near duplicates, get a duplicate_of field in both modes."
+        ),
+    )
+    parser.add_argument(
+        "--dedupe-threshold",
+        type=float,
+        default=0.9,
+        help="Jaccard similarity of question+option shingles above which entries are near duplicates (default: 0.9).",
+    )
+    parser.add_argument(
+        "--validate",
+        metavar="REPORT",
+        help=(
+            "Check the built corpus (no/all correct options, placeholder options, empty questions, duplicate "
+            "options, forced T/F answers, fix_missing_answers patches); write a JSON report with per-quiz counts."
+        ),
+    )
+    parser.add_argument(
+        "--fail-on",
+        metavar="FLAGS",
+        help=(
+            "Comma-separated validation flags (or 'all') that fail the build: the output is not written and the "
+            f"exit status is 1. Flags: {', '.join(VALIDATION_FLAGS)}."
+        ),
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help=(
+            "After the first run keep polling the input; when PDFs change, re-parse only those and "
+            "merge their entries into the output (hand-written explanations are kept). Stop with Ctrl+C."
+        ),
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=0.5,
+        help="Seconds between polls of the input in --watch mode (default: 0.5).",
+    )
+    parser.add_argument(
+        "--list-parsers", action="store_true", help="List the registered PDF formats and their backends, then exit."
+    )
     args = parser.parse_args()
 
+    if args.list_parsers:
+        for spec in PARSERS:
+            missing = missing_backends(spec)
+            backends = ", ".join(["/".join(group) for group in spec.backends] + list(spec.executables))
+            status = f"missing: {', '.join(missing)}" if missing else "ok"
+            print(f"{spec.name:<12} [{backends}] ({status})\n    {spec.description}")
+        return
+
     input_path = Path(args.input)
     output_path = Path(args.output)
 
+    fail_on: set[str] = set()
+    if args.fail_on:
+        fail_on = {flag.strip() for flag in args.fail_on.split(",") if flag.strip()}
+        if "all" in fail_on:
+            fail_on = set(VALIDATION_FLAGS)
+        if unknown := fail_on - set(VALIDATION_FLAGS):
+            parser.error(f"unknown --fail-on flags: {', '.join(sorted(unknown))}")
+    entry_notes = enable_entry_notes() if args.validate or fail_on else None
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    # Every --jobs worker starts its own OCR pool, so by default they share the CPUs.
+    ocr_workers = args.ocr_workers if args.ocr_workers > 0 else max((os.cpu_count() or 1) // jobs, 1)
+    cache_dir = None if args.no_cache else Path(args.cache_dir)
+    ocr_cache = None if cache_dir is None or args.no_ocr_cache else cache_dir / OCR_CACHE_FILENAME
+
+    records = enable_profiling() if args.profile else None
+    capture = set(args.profile_capture or ()) if args.profile else set()
+    profiler = None
+    if "cprofile" in capture:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    if "tracemalloc" in capture:
+        import tracemalloc
+
+        tracemalloc.start()
+
     pdf_files = collect_pdfs(input_path)
-    questions = build_questions(pdf_files)
+    # Sniff formats up front so a missing backend fails before any work starts.
+    problems = [
+        f"{pdf.name}: {spec.name} parser needs {', '.join(missing)}"
+        for pdf, spec in ((pdf, select_parser(pdf)) for pdf in pdf_files)
+        if (missing := missing_backends(spec))
+    ]
+    if problems:
+        parser.error("missing PDF backends:\n  " + "\n  ".join(problems))
+
+    build = partial(
+        build_questions if args.pipeline == "sync" else partial(build_questions_async, queue_size=args.queue_size),
+        jobs=jobs,
+        cache_dir=cache_dir,
+        ocr_resolution=args.ocr_dpi,
+        ocr_workers=ocr_workers,
+        ocr_timing=args.ocr_timing,
+        ocr_cache=ocr_cache,
+    )
+    questions: Iterable[dict] = build(pdf_files, rebuild=args.rebuild)
+
+    def merge_into_output(fresh: list[dict], quiz_ids: set[str]) -> list[dict]:
+        existing = load_questions(output_path, args.format)
+        merged, diff = merge_questions(existing, fresh, quiz_ids)
+        for kind, sign in (("added", "+"), ("changed", "~"), ("removed", "-")):
+            for qid in diff[kind]:
+                print(f"{sign} {qid}")
+        print(
+            f"{len(diff['added'])} added, {len(diff['changed'])} changed, {len(diff['removed'])} removed"
+        )
+        return merged
+
+    def write_outputs(questions: Iterable[dict]) -> bool:
+        if args.dedupe:
+            questions, stats = dedupe_questions(list(questions), args.dedupe, args.dedupe_threshold)
+            action = "collapsed" if args.dedupe == "collapse" else "linked"
+            print(
+                f"Dedupe: {stats['exact']} exact duplicates {action}, {stats['conflict']} with conflicting answers "
+                f"linked, {stats['near']} near duplicates linked"
+            )
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(json.dumps(questions, ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"Wrote {len(questions)} questions to {output_path}")
+        if entry_notes is not None:
+            questions = list(questions)
+            started = time.perf_counter()
+            report = validate_questions(questions, entry_notes)
+            elapsed = time.perf_counter() - started
+            counts = ", ".join(f"{flag} {count}" for flag, count in report["counts"].items() if count)
+            print(f"Validation ({elapsed * 1000:.1f} ms): {counts or 'no issues'}")
+            if args.validate:
+                report_path = Path(args.validate)
+                report_path.parent.mkdir(parents=True, exist_ok=True)
+                report_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+                print(f"Wrote validation report to {report_path}")
+            if failed := sorted(flag for flag in fail_on if report["counts"][flag]):
+                print(f"Validation failed ({', '.join(failed)}); not writing {output_path}")
+                return False
+
+        if args.deck or args.search_index:
+            # These are written from the same entries after the main output, so keep them.
+            questions = list(questions)
+
+        shard_dir = output_path.with_suffix("") if args.shard else None
+        count = write_questions(questions, output_path, args.format, shard_dir=shard_dir)
+        print(f"Wrote {count} questions to {output_path}")
+        if shard_dir is not None:
+            print(f"Wrote per-quiz shards to {shard_dir}")
+
+        if args.deck:
+            sizes = write_deck(questions, output_path)
+            pretty = json.dumps(questions, ensure_ascii=False, indent=2).encode("utf-8")
+            minified = output_path.with_suffix("").with_name(output_path.stem + ".min.json").read_bytes()
+            compressed = ", ".join(f"{k} {v / 1024:.1f} KB" for k, v in sizes.items() if k in ("gzip", "brotli"))
+            print(
+                f"Deck: pretty {len(pretty) / 1024:.1f} KB -> minified {sizes['minified'] / 1024:.1f} KB"
+                f" ({compressed}), index {sizes['index'] / 1024:.1f} KB"
+            )
+            print(
+                f"Deck parse time: pretty {_parse_seconds(pretty) * 1000:.2f} ms, "
+                f"minified {_parse_seconds(minified) * 1000:.2f} ms"
+            )
+
+        if args.search_index:
+            stats = write_search_index({output_path.name: questions}, Path(args.search_index))
+            print(
+                f"Wrote search index to {args.search_index} ({stats['docs']} questions, {stats['terms']} terms, "
+                f"{stats['bytes'] / 1024:.1f} KB)"
+            )
+
+        if cache_dir is not None:
+            cache_evict(cache_dir, int(args.cache_max_mb * 1024 * 1024))
+        return True
+
+    # Freshly parsed entries per quiz label, kept between --watch rounds.
+    results: dict[str, list[dict]] = {}
+    if args.watch:
+        questions = list(questions)
+        for q in questions:
+            results.setdefault(entry_quiz(q["id"]), []).append(q)
+
+    if args.update and output_path.exists():
+        questions = merge_into_output(list(questions), {quiz_label(pdf) for pdf in pdf_files})
+    passed = write_outputs(questions)
+
+    if records is not None:
+        report = profile_report(records)
+        report_path = Path(args.profile)
+        if profiler is not None:
+            import pstats
+
+            profiler.disable()
+            prof_path = report_path.with_suffix(".prof")
+            profiler.dump_stats(prof_path)
+            report["cprofile"] = str(prof_path)
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(args.profile_top)
+        if "tracemalloc" in capture:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            report["tracemalloc"] = {
+                "peak_mb": round(peak / (1024 * 1024), 2),
+                "top": [str(stat) for stat in snapshot.statistics("lineno")[: args.profile_top]],
+            }
+            print(f"tracemalloc peak: {report['tracemalloc']['peak_mb']} MB")
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print_profile_table(report, args.profile_top)
+        print(f"Wrote profile report to {report_path}")
+
+    if not passed and not args.watch:
+        parser.exit(1)
+
+    if args.watch:
+        print(f"Watching {input_path} for PDF changes (Ctrl+C to stop)...")
+        try:
+            for changed, removed in watch_pdfs(input_path, args.watch_interval):
+                started = time.perf_counter()
+                print(f"Changed: {', '.join(pdf.name for pdf in changed + removed)}")
+                quiz_ids = {quiz_label(pdf) for pdf in changed + removed}
+                try:
+                    fresh = list(build(changed))
+                except Exception as exc:  # e.g. a PDF that is still being written; the next save retries
+                    print(f"Error: {exc}")
+                    continue
+                for quiz_id in quiz_ids:
+                    results.pop(quiz_id, None)
+                for q in fresh:
+                    results.setdefault(entry_quiz(q["id"]), []).append(q)
+                if output_path.exists():
+                    write_outputs(merge_into_output(fresh, quiz_ids))
+                else:
+                    write_outputs([q for entries in results.values() for q in entries])
+                print(f"Updated in {time.perf_counter() - started:.2f}s")
+        except KeyboardInterrupt:
+            print("Stopped watching.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,110 @@
+import argparse
+import http.client
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+DEFAULT_PATHS = (
+    "/decks?topic=telekom",
+    "/decks?topic=szamelm",
+    "/decks?topic=konkurens",
+    "/questions-telekom.json",
+)
+
+
+def _worker(url, paths, deadline, conditional, gzip, results, lock):
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=10)
+    etags: dict[str, str] = {}
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    sent = received = 0
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        headers = {"Accept-Encoding": "gzip"} if gzip else {}
+        if conditional and path in etags:
+            headers["If-None-Match"] = etags[path]
+        started = time.perf_counter()
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+            body = resp.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=10)
+            statuses[0] = statuses.get(0, 0) + 1
+            continue
+        latencies.append(time.perf_counter() - started)
+        statuses[resp.status] = statuses.get(resp.status, 0) + 1
+        sent += 1
+        received += len(body)
+        if resp.getheader("ETag"):
+            etags[path] = resp.getheader("ETag")
+    conn.close()
+    with lock:
+        results["latencies"].extend(latencies)
+        results["requests"] += sent
+        results["bytes"] += received
+        for status, count in statuses.items():
+            results["statuses"][status] = results["statuses"].get(status, 0) + count
+
+
+def run(url: str, paths: list[str], concurrency: int, duration: float, conditional: bool, gzip: bool) -> dict:
+    """Párhuzamos keep-alive kapcsolatok a megadott ideig; kérés/s és késleltetés-percentilisek."""
+    results = {"latencies": [], "requests": 0, "bytes": 0, "statuses": {}}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=_worker, args=(url, paths, deadline, conditional, gzip, results, lock))
+        for _ in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(results["latencies"])
+
+    def pct(p: float) -> float:
+        return latencies[min(int(p * len(latencies)), len(latencies) - 1)] * 1000 if latencies else 0.0
+
+    return {
+        "requests": results["requests"],
+        "rps": results["requests"] / elapsed,
+        "mb_per_s": results["bytes"] / elapsed / (1024 * 1024),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "statuses": dict(sorted(results["statuses"].items())),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure requests/sec of a running serve_decks.py instance.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Server base URL (default: http://127.0.0.1:8000).")
+    parser.add_argument("--path", action="append", help="Request path (repeatable; default: every topic deck).")
+    parser.add_argument("--concurrency", "-c", type=int, default=8, help="Parallel connections (default: 8).")
+    parser.add_argument("--duration", "-d", type=float, default=5.0, help="Seconds to run (default: 5).")
+    parser.add_argument(
+        "--conditional", action="store_true", help="Revalidate with If-None-Match after the first response."
+    )
+    parser.add_argument("--no-gzip", action="store_true", help="Do not send Accept-Encoding: gzip.")
+    args = parser.parse_args()
+
+    paths = args.path or list(DEFAULT_PATHS)
+    stats = run(args.url, paths, args.concurrency, args.duration, args.conditional, not args.no_gzip)
+    print(
+        f"{stats['requests']} requests in {args.duration:.1f}s: {stats['rps']:.0f} req/s, "
+        f"{stats['mb_per_s']:.1f} MB/s"
+    )
+    print(f"latency p50 {stats['p50_ms']:.2f} ms, p95 {stats['p95_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms")
+    print("status " + ", ".join(f"{status}: {count}" for status, count in stats["statuses"].items()))
+
+
+if __name__ == "__main__":
+    main()
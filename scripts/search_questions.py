@@ -0,0 +1,154 @@
+import argparse
+import math
+import mmap
+import time
+from pathlib import Path
+
+import extract_questions as eq
+
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DECKS = ("questions.json", "questions-telekom.json", "questions-konkurens.json")
+DEFAULT_INDEX = ROOT / "questions.qidx"
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+class SearchIndex:
+    """Az :func:`extract_questions.write_search_index` fájljának olvasója; a táblákat csak mmap-en át érjük el."""
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, decks, docs, terms, postings, total = eq.SEARCH_HEADER.unpack_from(self._mm, 0)
+        if magic != eq.SEARCH_INDEX_MAGIC or version != eq.SEARCH_INDEX_VERSION:
+            raise ValueError(f"{path}: not a search index (version {eq.SEARCH_INDEX_VERSION})")
+        self.doc_count = docs
+        self.term_count = terms
+        self._decks_at = eq.SEARCH_HEADER.size
+        self._docs_at = self._decks_at + decks * eq.SEARCH_DECK.size
+        self._terms_at = self._docs_at + docs * eq.SEARCH_DOC.size
+        self._postings_at = self._terms_at + terms * eq.SEARCH_TERM.size
+        self._strings_at = self._postings_at + postings * eq.SEARCH_POSTING.size
+        self.decks = [
+            self._string(*eq.SEARCH_DECK.unpack_from(self._mm, self._decks_at + i * eq.SEARCH_DECK.size)).decode()
+            for i in range(decks)
+        ]
+        self._avg_len = total / docs if docs else 0.0
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def _string(self, offset: int, length: int) -> bytes:
+        start = self._strings_at + offset
+        return self._mm[start : start + length]
+
+    def _doc(self, doc: int) -> tuple[int, int, int, int]:
+        return eq.SEARCH_DOC.unpack_from(self._mm, self._docs_at + doc * eq.SEARCH_DOC.size)
+
+    def _term(self, index: int) -> tuple[bytes, int, int]:
+        offset, length, first, df = eq.SEARCH_TERM.unpack_from(self._mm, self._terms_at + index * eq.SEARCH_TERM.size)
+        return self._string(offset, length), first, df
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self.term_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _matching_terms(self, token: str, prefix: bool) -> list[tuple[int, int]]:
+        key = token.encode("utf-8")
+        found = []
+        index = self._lower_bound(key)
+        while index < self.term_count:
+            term, first, df = self._term(index)
+            if term != key and not (prefix and term.startswith(key)):
+                break
+            found.append((first, df))
+            index += 1
+        return found
+
+    def doc_id(self, doc: int) -> tuple[str, str]:
+        offset, length, deck, _ = self._doc(doc)
+        return self._string(offset, length).decode(), self.decks[deck]
+
+    def search(self, query: str, limit: int = 10, prefix_last: bool = True) -> list[tuple[float, str, str]]:
+        """BM25-rangsor: előbb a több lekérdezés-szót tartalmazó kérdések, azon belül pontszám szerint.
+
+        Az utolsó szó prefixként is illeszkedik (gépelés közbeni kereséshez).
+        """
+        tokens = eq.search_tokens(query)
+        scores: dict[int, float] = {}
+        matched: dict[int, int] = {}
+        for position, token in enumerate(tokens):
+            hits: dict[int, float] = {}
+            for first, df in self._matching_terms(token, prefix_last and position == len(tokens) - 1):
+                idf = math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+                for k in range(first, first + df):
+                    doc, tf = eq.SEARCH_POSTING.unpack_from(self._mm, self._postings_at + k * eq.SEARCH_POSTING.size)
+                    length = self._doc(doc)[3]
+                    norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * length / self._avg_len)
+                    hits[doc] = hits.get(doc, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+            for doc, score in hits.items():
+                scores[doc] = scores.get(doc, 0.0) + score
+                matched[doc] = matched.get(doc, 0) + 1
+        ranked = sorted(scores, key=lambda doc: (-matched[doc], -scores[doc], doc))[:limit]
+        return [(scores[doc], *self.doc_id(doc)) for doc in ranked]
+
+
+def build(deck_paths: list[Path], index_path: Path) -> dict:
+    decks = {path.name: eq.load_questions(path) for path in deck_paths}
+    return eq.write_search_index(decks, index_path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Search the question decks through a prebuilt inverted index.")
+    parser.add_argument("query", nargs="*", help="Words to search for (accents and case are ignored).")
+    parser.add_argument("--index", default=str(DEFAULT_INDEX), help=f"Index file (default: {DEFAULT_INDEX.name}).")
+    parser.add_argument(
+        "--build",
+        nargs="*",
+        metavar="DECK",
+        help="(Re)build the index from these deck JSON files first (default: the three decks in the repository).",
+    )
+    parser.add_argument("--limit", "-n", type=int, default=10, help="Number of results (default: 10).")
+    parser.add_argument("--exact", action="store_true", help="Do not treat the last word as a prefix.")
+    parser.add_argument("--show", action="store_true", help="Print the question text of every hit (loads the decks).")
+    args = parser.parse_args()
+
+    index_path = Path(args.index)
+    if args.build is not None:
+        deck_paths = [Path(p) for p in args.build] or [ROOT / name for name in DEFAULT_DECKS]
+        started = time.perf_counter()
+        stats = build(deck_paths, index_path)
+        print(
+            f"Indexed {stats['docs']} questions ({stats['terms']} terms, {stats['bytes'] / 1024:.1f} KB) "
+            f"into {index_path} in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+    if not args.query:
+        return
+
+    index = SearchIndex(index_path)
+    started = time.perf_counter()
+    results = index.search(" ".join(args.query), args.limit, prefix_last=not args.exact)
+    elapsed = time.perf_counter() - started
+    texts: dict[str, dict[str, str]] = {}
+    for score, qid, deck in results:
+        line = f"{score:7.2f}  {qid}  ({deck})"
+        if args.show:
+            if deck not in texts:
+                deck_path = next((d / deck for d in (index_path.parent, ROOT) if (d / deck).exists()), None)
+                entries = eq.load_questions(deck_path) if deck_path else []
+                texts[deck] = {q["id"]: q.get("question", "") for q in entries}
+            line += "\n         " + texts[deck].get(qid, "").replace("\n", " ")[:160]
+        print(line)
+    print(f"{len(results)} results in {elapsed * 1000:.2f} ms")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
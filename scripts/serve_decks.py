@@ -0,0 +1,252 @@
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import threading
+import time
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import extract_questions as eq
+
+
+# Same topics as getTopicConfig() in app.js.
+TOPICS = {
+    "szamelm": "questions.json",
+    "telekom": "questions-telekom.json",
+    "konkurens": "questions-konkurens.json",
+}
+DEFAULT_TOPIC = "szamelm"
+# The only static files served from the root; everything else (.git/, .extract-cache/, scripts ...) is 404.
+APP_FILES = {"", "index.html", "quiz.html", "app.js", "style.css"}
+GZIP_MIN_BYTES = 1024
+RE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class Deck:
+    """Egy téma kérdései memóriában, kvízenként előre kódolt (és tömörített) válaszokkal."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.mtime_ns = -1
+        self.entries: list[dict] = []
+        self._bodies: dict[str | None, tuple[bytes, bytes, str]] = {}
+        self._lock = threading.Lock()
+
+    def reload_if_changed(self) -> bool:
+        try:
+            mtime_ns = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime_ns == self.mtime_ns:
+            return False
+        try:
+            entries = eq.load_questions(self.path)
+        except (OSError, ValueError):  # half-written output; the next poll picks it up
+            return False
+        with self._lock:
+            self.entries = entries
+            self.mtime_ns = mtime_ns
+            self._bodies = {}
+        return True
+
+    def body(self, quiz: str | None) -> tuple[bytes, bytes, str] | None:
+        """(nyers, gzip, ETag) a teljes paklira vagy egy kvíz-címke részhalmazára."""
+        with self._lock:
+            cached = self._bodies.get(quiz)
+            if cached is not None:
+                return cached
+            entries = self.entries
+            if quiz is not None:
+                entries = [q for q in entries if eq.entry_quiz(q["id"]) == quiz]
+            if quiz is not None and not entries:
+                return None
+            raw = json.dumps(entries, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            etag = hashlib.sha256(raw).hexdigest()[:32]
+            self._bodies[quiz] = cached = (raw, gzip.compress(raw, compresslevel=6, mtime=0), etag)
+            return cached
+
+
+def watch_decks(decks: dict[str, Deck], interval: float) -> None:
+    while True:
+        for topic, deck in decks.items():
+            if deck.reload_if_changed():
+                print(f"Loaded {len(deck.entries)} questions for {topic} from {deck.path}")
+        time.sleep(interval)
+
+
+class DeckHandler(SimpleHTTPRequestHandler):
+    """Statikus fájlok a gyökérből, a paklik memóriából ETag-gel, gzip-pel és Range-dzsel.
+
+    Pakli-útvonalak: ``/decks?topic=<téma>&quiz=<kvíz>``, valamint az app.js által kért
+    ``/<téma-fájl>.json`` és ``/<téma-fájl>/<kvíz>.json`` (az extractor --shard elrendezése).
+    """
+
+    decks: dict[str, Deck] = {}
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def do_GET(self):
+        if self._send_deck(head=False):
+            return
+        if not self._is_public():
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        super().do_GET()
+
+    def do_HEAD(self):
+        if self._send_deck(head=True):
+            return
+        if not self._is_public():
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        super().do_HEAD()
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _is_public(self) -> bool:
+        """Az alkalmazás fájljai és a paklik extractor-kimenetei (--deck, --shard); más nem."""
+        path = unquote(urlsplit(self.path).path).lstrip("/")
+        parts = path.split("/")
+        if any(part.startswith(".") or part == "" for part in parts[:-1]) or parts[-1].startswith("."):
+            return False
+        if path in APP_FILES:
+            return True
+        for deck in self.decks.values():
+            stem = deck.path.stem
+            if len(parts) == 1 and path.startswith(f"{stem}."):  # .min.json(.gz/.br), .index.json
+                return True
+            if len(parts) == 2 and parts[0] in (stem, f"{stem}.chunks") and parts[1]:  # shards and chunks
+                return True
+        return False
+
+    def _route(self) -> tuple[Deck, str | None] | None:
+        url = urlsplit(self.path)
+        path = unquote(url.path).lstrip("/")
+        if path == "decks":
+            params = parse_qs(url.query)
+            topic = params.get("topic", [DEFAULT_TOPIC])[0].lower()
+            quiz = params.get("quiz", [None])[0]
+            deck = self.decks.get(topic) or self.decks[DEFAULT_TOPIC]
+            return deck, quiz
+        for deck in self.decks.values():
+            stem = deck.path.stem
+            if path == deck.path.name:
+                return deck, None
+            if path.startswith(f"{stem}/") and path.endswith(".json") and path.count("/") == 1:
+                return deck, path[len(stem) + 1 : -len(".json")]
+        return None
+
+    def _send_deck(self, head: bool) -> bool:
+        route = self._route()
+        if route is None:
+            return False
+        deck, quiz = route
+        found = deck.body(quiz)
+        if found is None:
+            self.send_error(HTTPStatus.NOT_FOUND, f"No questions for quiz {quiz!r}")
+            return True
+        raw, gzipped, etag = found
+
+        range_header = self.headers.get("Range")
+        use_gzip = (
+            range_header is None
+            and len(raw) >= GZIP_MIN_BYTES
+            and "gzip" in self.headers.get("Accept-Encoding", "")
+        )
+        # Strong validators differ per representation.
+        etag = f'"{etag}-gz"' if use_gzip else f'"{etag}"'
+        body = gzipped if use_gzip else raw
+
+        status = HTTPStatus.OK
+        content_range = None
+        if etag in {tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")}:
+            status, body = HTTPStatus.NOT_MODIFIED, b""
+        elif range_header is not None and self.headers.get("If-Range", etag) == etag:
+            match = RE_RANGE.match(range_header.strip())
+            start, end = (match.groups() if match else ("", ""))
+            if not match or (not start and not end):
+                start = end = None
+            elif not start:  # suffix range: the last N bytes
+                start, end = max(len(raw) - int(end), 0), len(raw) - 1
+            else:
+                start, end = int(start), min(int(end) if end else len(raw) - 1, len(raw) - 1)
+            if start is None or start > end:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{len(raw)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return True
+            status, body = HTTPStatus.PARTIAL_CONTENT, raw[start : end + 1]
+            content_range = f"bytes {start}-{end}/{len(raw)}"
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Accept-Ranges", "bytes")
+        if use_gzip and status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Encoding", "gzip")
+        if content_range:
+            self.send_header("Content-Range", content_range)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+        return True
+
+
+def make_server(root: Path, host: str, port: int, quiet: bool = False) -> ThreadingHTTPServer:
+    decks = {topic: Deck(root / name) for topic, name in TOPICS.items()}
+    for deck in decks.values():
+        deck.reload_if_changed()
+    handler = type("Handler", (DeckHandler,), {"decks": decks})
+    server = ThreadingHTTPServer((host, port), partial(handler, directory=str(root)))
+    server.daemon_threads = True
+    server.quiet = quiet
+    server.decks = decks
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Serve the quiz and its question decks (in memory, with ETag, gzip and Range support)."
+    )
+    parser.add_argument(
+        "--root",
+        default=str(Path(__file__).resolve().parent.parent),
+        help="Directory with index.html, app.js and the questions*.json decks (default: the repository root).",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: 127.0.0.1).")
+    parser.add_argument("--port", "-p", type=int, default=8000, help="Port to listen on (default: 8000).")
+    parser.add_argument(
+        "--reload-interval",
+        type=float,
+        default=1.0,
+        help="Seconds between checks for new extractor output (default: 1.0).",
+    )
+    parser.add_argument("--quiet", "-q", action="store_true", help="Do not log every request.")
+    args = parser.parse_args()
+
+    server = make_server(Path(args.root), args.host, args.port, quiet=args.quiet)
+    for topic, deck in server.decks.items():
+        print(f"Loaded {len(deck.entries)} questions for {topic} from {deck.path}")
+    threading.Thread(target=watch_decks, args=(server.decks, args.reload_interval), daemon=True).start()
+    print(f"Serving on http://{args.host}:{server.server_address[1]}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopped.")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()